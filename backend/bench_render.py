@@ -0,0 +1,111 @@
+"""
+Resume Rendering Benchmark
+Measures PDF renders/sec with per-call setup (a fresh PdfRenderer each time, as
+generate_pdf used to do), with a shared renderer, and through the RenderPool.
+Also reports how long the event loop stalls while renders are running.
+
+Usage: python bench_render.py [renders] [workers]
+"""
+import asyncio
+import sys
+import time
+
+from pdf_renderer import PdfRenderer
+from renderers import RenderPool
+from resume_layout import build_layout
+
+SAMPLE_RESUME = build_layout({
+    "id": "bench",
+    "full_name": "Jane Doe",
+    "email": "jane@example.com",
+    "phone": "(555) 123-4567",
+    "sections": [
+        {"section_name": "Summary", "content": "Backend engineer with 8 years of experience building APIs."},
+        {"section_name": "Experience", "content": "\n".join(
+            f"Senior Engineer | Company {i} | Jan {2010 + i} - Dec {2011 + i}\n"
+            "- Led migration to FastAPI and MongoDB\n"
+            "- Cut p99 latency by 40% across 12 services\n"
+            "- Mentored four engineers"
+            for i in range(6)
+        )},
+        {"section_name": "Education", "content": "B.Sc. Computer Science | State University | 2015"},
+        {"section_name": "Skills", "content": "Python, FastAPI, MongoDB\nDocker, Kubernetes\nAWS, Terraform"},
+    ],
+})
+
+
+def timed_sequential(render, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        render(SAMPLE_RESUME)
+    return time.perf_counter() - start
+
+
+async def max_loop_stall(work):
+    """Run ``work`` while a ticker measures the longest gap between event loop turns."""
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stall = max(stall, now - last - 0.001)
+            last = now
+
+    tick = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await work()
+    elapsed = time.perf_counter() - start
+    done = True
+    await tick
+    return elapsed, stall
+
+
+async def run_async(count, workers):
+    renderer = PdfRenderer()
+
+    async def inline():
+        for _ in range(count):
+            renderer.render(SAMPLE_RESUME)
+            await asyncio.sleep(0)
+
+    pool = RenderPool(workers)
+    await pool.render(SAMPLE_RESUME, "pdf")  # start the workers outside the measurement
+
+    async def pooled():
+        await asyncio.gather(*(pool.render(SAMPLE_RESUME, "pdf") for _ in range(count)))
+
+    try:
+        return await max_loop_stall(inline), await max_loop_stall(pooled)
+    finally:
+        pool.shutdown()
+
+
+def run_benchmark(count=200, workers=4):
+    print("=" * 70)
+    print(f"PDF rendering benchmark ({count} renders, {workers} pool workers)")
+    print("=" * 70)
+    print(f"{'mode':<34}{'renders/sec':>14}{'max loop stall':>18}")
+    print("-" * 70)
+
+    fresh = timed_sequential(lambda data: PdfRenderer().render(data), count)
+    print(f"{'per-call setup (old generate_pdf)':<34}{count / fresh:>14,.0f}{'-':>18}")
+
+    shared_renderer = PdfRenderer()
+    shared = timed_sequential(shared_renderer.render, count)
+    print(f"{'shared PdfRenderer':<34}{count / shared:>14,.0f}{'-':>18}")
+
+    (inline, inline_stall), (pooled, pooled_stall) = asyncio.run(run_async(count, workers))
+    print(f"{'on the event loop':<34}{count / inline:>14,.0f}{inline_stall * 1000:>15.1f} ms")
+    print(f"{'RenderPool':<34}{count / pooled:>14,.0f}{pooled_stall * 1000:>15.1f} ms")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        int(sys.argv[1]) if len(sys.argv) > 1 else 200,
+        int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    )
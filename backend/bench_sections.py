@@ -0,0 +1,99 @@
+"""
+Section Parser Benchmark
+Compares the legacy four-regex parser with the single-pass SectionTokenizer
+on a realistic resume and on the legacy parser's worst-case ~1 MB inputs.
+
+The legacy patterns always succeed at ``$``, so their worst case is linear:
+each lazy ``[\s\S]*?`` scans from a heading to the first blank line or later
+heading, and without one it runs to the end of the text. On well-formed
+resumes that terminator comes early and the legacy parser is faster; the
+tokenizer reads every line either way.
+
+Usage: python bench_sections.py [size_in_kb]
+"""
+import re
+import sys
+import time
+
+from section_parser import SectionTokenizer
+
+LEGACY_PATTERNS = [
+    (r"(SUMMARY|PROFESSIONAL SUMMARY|OBJECTIVE)\s*:?\s*([\s\S]*?)(?=\n\n|EXPERIENCE|EDUCATION|SKILLS|$)", "Summary"),
+    (r"(EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT)\s*:?\s*([\s\S]*?)(?=\n\n|EDUCATION|SKILLS|$)", "Experience"),
+    (r"(EDUCATION|ACADEMIC BACKGROUND)\s*:?\s*([\s\S]*?)(?=\n\n|EXPERIENCE|SKILLS|$)", "Education"),
+    (r"(SKILLS|TECHNICAL SKILLS|COMPETENCIES)\s*:?\s*([\s\S]*?)(?=\n\n|EXPERIENCE|EDUCATION|$)", "Skills"),
+]
+
+SAMPLE_RESUME = """Jane Doe
+jane@example.com | (555) 123-4567
+
+SUMMARY
+Backend engineer with 8 years of experience building APIs.
+
+EXPERIENCE
+Senior Engineer | Acme Corp | Jan 2020 - Present
+- Led migration to FastAPI and MongoDB
+- Cut p99 latency by 40%
+
+EDUCATION
+B.Sc. Computer Science | State University | 2015
+
+SKILLS
+Python, FastAPI, MongoDB, Docker, Kubernetes
+"""
+
+SAMPLE_BODY = "- Built APIs in Python and shipped them to production\n"
+
+
+def legacy_parse(text):
+    sections = []
+    for pattern, name in LEGACY_PATTERNS:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            sections.append((name, match.group(2).strip()))
+    return sections or [("Content", text)]
+
+
+def build_inputs(size):
+    return {
+        "repeated resume": (SAMPLE_RESUME * (size // len(SAMPLE_RESUME) + 1))[:size],
+        # One heading, then no blank line or other heading: the Summary match scans to the end
+        "heading, no terminator": ("SUMMARY\n" + SAMPLE_BODY * (size // len(SAMPLE_BODY) + 1))[:size],
+        # The same on one giant line with no newlines at all
+        "single line": ("skills " * (size // 7 + 1))[:size],
+        # No heading at all: all four searches try every position against near-miss prefixes
+        "near-miss prefixes": ("EXPERIENC EDUCATIO SKILL SUMMAR " * (size // 32 + 1))[:size],
+    }
+
+
+def timed(fn, text, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_benchmark(size_kb=1024):
+    tokenizer = SectionTokenizer()
+    size = size_kb * 1024
+
+    print("=" * 70)
+    print(f"Section parsing benchmark ({size_kb} KB inputs, best of 3)")
+    print("=" * 70)
+    print(f"{'input':<28}{'legacy regex':>16}{'tokenizer':>14}{'speedup':>12}")
+    print("-" * 70)
+
+    for label, text in build_inputs(size).items():
+        legacy = timed(legacy_parse, text)
+        single_pass = timed(tokenizer.parse, text)
+        speedup = legacy / single_pass if single_pass else float("inf")
+        print(f"{label:<28}{legacy * 1000:>13.1f} ms{single_pass * 1000:>11.1f} ms{speedup:>11.2f}x")
+
+    print("=" * 70)
+    print("speedup < 1x: the legacy regex stops at the first blank line, the tokenizer reads every line")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 1024)
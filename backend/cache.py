@@ -0,0 +1,146 @@
+"""
+In-process LRU cache with a MongoDB-backed second tier
+"""
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with optional per-entry TTL."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at < time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds else None
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._data.pop(key, None)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class TieredCache:
+    """LRU cache in front of a MongoDB collection.
+
+    Documents are stored as ``{"_id": key, "value": ..., "last_used_at": ...}``.
+    Each database hit bumps ``last_used_at`` in the same round trip, so a TTL
+    index on that field evicts entries that have not been used recently.
+    Database errors are logged and treated as misses; the cache never fails
+    the request it is serving.
+    """
+
+    def __init__(self, name: str, collection, max_entries: int = 256,
+                 memory_ttl_seconds: Optional[float] = None,
+                 db_ttl_seconds: Optional[int] = None):
+        self.name = name
+        self.collection = collection
+        self.memory = LRUCache(max_entries, memory_ttl_seconds)
+        self.db_ttl_seconds = db_ttl_seconds
+        self.db_hits = 0
+        self.db_misses = 0
+
+    def indexes(self) -> List[IndexModel]:
+        if not self.db_ttl_seconds:
+            return []
+        return [IndexModel("last_used_at", name="last_used_at_1", expireAfterSeconds=self.db_ttl_seconds)]
+
+    async def ensure_indexes(self):
+        if self.db_ttl_seconds:
+            await self.collection.create_indexes(self.indexes())
+
+    async def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None:
+            return value
+
+        try:
+            doc = await self.collection.find_one_and_update(
+                {"_id": key},
+                {"$set": {"last_used_at": datetime.now(timezone.utc)}},
+                projection={"value": 1}
+            )
+        except Exception as e:
+            logger.error(f"{self.name} cache lookup failed: {e}")
+            doc = None
+
+        if doc is None:
+            self.db_misses += 1
+            return None
+
+        self.db_hits += 1
+        self.memory.set(key, doc["value"])
+        return doc["value"]
+
+    async def set(self, key: str, value: Any):
+        self.memory.set(key, value)
+        now = datetime.now(timezone.utc)
+        try:
+            await self.collection.replace_one(
+                {"_id": key},
+                {"value": value, "created_at": now, "last_used_at": now},
+                upsert=True
+            )
+        except Exception as e:
+            logger.error(f"{self.name} cache store failed: {e}")
+
+    async def delete(self, key: str):
+        self.memory.delete(key)
+        try:
+            await self.collection.delete_one({"_id": key})
+        except Exception as e:
+            logger.error(f"{self.name} cache delete failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self.memory.stats()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.db_hits
+        return {
+            "memory": memory,
+            "db_hits": self.db_hits,
+            "db_misses": self.db_misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
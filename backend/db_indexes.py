@@ -0,0 +1,222 @@
+"""
+MongoDB index definitions, start-up bootstrap and query-plan checks
+"""
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Indexes for the application's own collections; caches, locks and the job
+# queue describe theirs through an ``indexes()`` method
+APP_INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email_1", unique=True),
+        IndexModel([("id", ASCENDING)], name="id_1", unique=True),
+    ],
+    "resumes": [
+        IndexModel([("id", ASCENDING)], name="id_1", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_1_created_at_-1"),
+    ],
+    "enhanced_resumes": [
+        IndexModel([("id", ASCENDING)], name="id_1", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_1_created_at_-1"),
+    ],
+    "ats_scores": [
+        IndexModel([("resume_id", ASCENDING)], name="resume_id_1", unique=True),
+        IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_id_1_created_at_-1"),
+    ],
+}
+
+# (collection, filter, sort) for the lookups on the request path, checked with explain()
+HOT_QUERIES: List[Tuple[str, Dict[str, Any], Optional[List[Tuple[str, int]]]]] = [
+    ("users", {"email": "user@example.com"}, None),
+    ("users", {"id": ""}, None),
+    ("resumes", {"id": ""}, None),
+    ("enhanced_resumes", {"id": ""}, None),
+    # $lookup of legacy scores in ResumeStore.get_with_score
+    ("ats_scores", {"resume_id": ""}, None),
+    ("resumes", {"user_id": ""}, [("created_at", DESCENDING)]),
+    ("enhanced_resumes", {"user_id": ""}, [("created_at", DESCENDING)]),
+]
+
+# Server errors for an existing index with the same name or keys but different options
+INDEX_CONFLICT_CODES = (85, 86)
+# Options compared between the definition and the index in the database
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+# index_information() fields that are not options for create_indexes
+INFO_ONLY_FIELDS = ("key", "v", "ns")
+
+
+def _key(spec: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    key = spec["key"]
+    return list(key.items()) if isinstance(key, dict) else [tuple(k) for k in key]
+
+
+def _matches(model: IndexModel, existing: Dict[str, Any]) -> bool:
+    wanted = model.document
+    if _key(wanted) != _key(existing):
+        return False
+    return all(wanted.get(option) == existing.get(option) for option in COMPARED_OPTIONS)
+
+
+def collect_indexes(owners: Iterable[Any] = ()) -> Dict[str, List[IndexModel]]:
+    """APP_INDEXES plus the ``indexes()`` of each owner (an object with a ``collection``)."""
+    indexes = {name: list(models) for name, models in APP_INDEXES.items()}
+    for owner in owners:
+        models = owner.indexes()
+        if models:
+            indexes.setdefault(owner.collection.name, []).extend(models)
+    return indexes
+
+
+async def index_report(db, indexes: Dict[str, List[IndexModel]]) -> Dict[str, Dict[str, List[str]]]:
+    """Per collection, the defined indexes that are ``missing`` (or differ) and the ``extra`` ones."""
+    report = {}
+    for name, models in indexes.items():
+        existing = await db[name].index_information()
+        wanted = {model.document["name"]: model for model in models}
+        report[name] = {
+            "missing": [n for n, model in wanted.items() if n not in existing or not _matches(model, existing[n])],
+            "extra": [n for n in existing if n != "_id_" and n not in wanted],
+        }
+    return report
+
+
+def _model_of(name: str, info: Dict[str, Any]) -> IndexModel:
+    """IndexModel recreating an index from its ``index_information()`` entry."""
+    options = {k: v for k, v in info.items() if k not in INFO_ONLY_FIELDS}
+    return IndexModel(_key(info), **{**options, "name": name})
+
+
+async def _find_duplicate(collection, model: IndexModel) -> Optional[Dict[str, Any]]:
+    """A key value held by more than one document, which would fail a unique build."""
+    spec = model.document
+    fields = [field for field, _ in _key(spec)]
+    pipeline = [{"$match": spec["partialFilterExpression"]}] if "partialFilterExpression" in spec else []
+    pipeline += [
+        {"$group": {"_id": {f.replace(".", "_"): f"${f}" for f in fields}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+        {"$limit": 1},
+    ]
+    duplicates = await collection.aggregate(pipeline, allowDiskUse=True).to_list(1)
+    return duplicates[0]["_id"] if duplicates else None
+
+
+async def _create(collection, model: IndexModel) -> bool:
+    name = model.document["name"]
+    try:
+        await collection.create_indexes([model])
+        return True
+    except OperationFailure as e:
+        if e.code not in INDEX_CONFLICT_CODES:
+            logger.error(f"Could not create index {collection.name}.{name}: {e}")
+            return False
+
+    # Same name or keys with different options (a changed TTL, a unique flag
+    # added later): rebuild the old index with the current definition. The
+    # server refuses a second index on the same keys, so the old one has to go
+    # first; a unique build is checked for duplicates beforehand and the old
+    # index is put back if the new one still fails.
+    if model.document.get("unique"):
+        duplicate = await _find_duplicate(collection, model)
+        if duplicate is not None:
+            logger.error(f"Could not rebuild index {collection.name}.{name} as unique: duplicate key {duplicate}")
+            return False
+
+    key = _key(model.document)
+    replaced = {existing: info for existing, info in (await collection.index_information()).items()
+                if existing == name or _key(info) == key}
+    for existing in replaced:
+        logger.warning(f"Rebuilding index {collection.name}.{existing} to match {name}")
+        try:
+            await collection.drop_index(existing)
+        except OperationFailure as e:
+            # Another worker rebuilding the same index dropped it first
+            logger.info(f"Index {collection.name}.{existing} already dropped: {e}")
+    try:
+        await collection.create_indexes([model])
+        return True
+    except OperationFailure as e:
+        logger.error(f"Could not create index {collection.name}.{name}: {e}")
+
+    for existing, info in replaced.items():
+        try:
+            await collection.create_indexes([_model_of(existing, info)])
+            logger.warning(f"Restored previous index {collection.name}.{existing}")
+        except OperationFailure as e:
+            logger.error(f"Could not restore index {collection.name}.{existing}: {e}")
+    return False
+
+
+async def ensure_indexes(db, indexes: Dict[str, List[IndexModel]]) -> Dict[str, Dict[str, List[str]]]:
+    """Create missing indexes, migrate ones whose options changed, and return the report.
+
+    Failures (e.g. duplicate values blocking a unique index) are logged and
+    left in the report's ``missing`` list rather than stopping start-up.
+    Extra indexes are only reported, never dropped.
+    """
+    report = await index_report(db, indexes)
+    for name, models in indexes.items():
+        missing = set(report[name]["missing"])
+        for model in models:
+            if model.document["name"] in missing:
+                if await _create(db[name], model):
+                    logger.info(f"Created index {name}.{model.document['name']}")
+
+    report = await index_report(db, indexes)
+    for name, entry in report.items():
+        if entry["missing"]:
+            logger.warning(f"Indexes missing on {name}: {', '.join(entry['missing'])}")
+        if entry["extra"]:
+            logger.info(f"Indexes on {name} not defined by the app: {', '.join(entry['extra'])}")
+    return report
+
+
+def _plan_stages(stage: Dict[str, Any]) -> Iterable[Dict[str, Any]]:
+    yield stage
+    for child in ("inputStage", "queryPlan"):
+        if child in stage:
+            yield from _plan_stages(stage[child])
+    for nested in stage.get("inputStages", []):
+        yield from _plan_stages(nested)
+
+
+async def explain_query(db, collection: str, filter: Dict[str, Any],
+                        sort: Optional[List[Tuple[str, int]]] = None) -> Dict[str, Any]:
+    """Winning plan for a single-document find: its stages and the index used, if any."""
+    command = {"find": collection, "filter": filter, "limit": 1}
+    if sort:
+        command["sort"] = dict(sort)
+    result = await db.command({"explain": command, "verbosity": "queryPlanner"})
+    winning = result["queryPlanner"]["winningPlan"]
+    stages = list(_plan_stages(winning))
+    index = next((s.get("indexName") for s in stages if s.get("stage") == "IXSCAN"), None)
+    return {
+        "collection": collection,
+        "filter": sorted(filter),
+        "sort": [field for field, _ in sort or []],
+        "stages": [s.get("stage") for s in stages],
+        "index": index,
+        "collection_scan": any(s.get("stage") == "COLLSCAN" for s in stages),
+    }
+
+
+async def explain_hot_queries(db) -> List[Dict[str, Any]]:
+    """Explain every HOT_QUERIES lookup, logging a warning for any collection scan."""
+    plans = []
+    for collection, filter, sort in HOT_QUERIES:
+        try:
+            plan = await explain_query(db, collection, filter, sort)
+        except Exception as e:
+            logger.warning(f"Could not explain query on {collection}: {e}")
+            continue
+        query = f"{collection} {plan['filter']}" + (f" sort {plan['sort']}" if plan["sort"] else "")
+        if plan["collection_scan"]:
+            logger.warning(f"Query plan for {query}: collection scan ({' <- '.join(plan['stages'])})")
+        else:
+            logger.info(f"Query plan for {query}: {plan['index']} ({' <- '.join(plan['stages'])})")
+        plans.append(plan)
+    return plans
@@ -0,0 +1,48 @@
+"""
+Enhancement Job Worker
+Runs queued /api/resume/enhance/jobs work outside the API processes so
+enhancement throughput scales independently of the web tier. Start as many
+of these as needed and set ENHANCE_JOB_CONCURRENCY=0 on the API servers.
+
+Usage: python enhance_worker.py [--concurrency 8]
+"""
+import argparse
+import asyncio
+import os
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from jobs import JobWorker  # noqa: E402
+from server import JOB_HANDLERS, client, job_queue, llm_ops, warm_tokenizer  # noqa: E402
+
+
+async def run_worker(concurrency):
+    await job_queue.ensure_indexes()
+    # Load the tokenizer off the event loop before the first job builds a prompt
+    await warm_tokenizer()
+    worker = JobWorker(job_queue, JOB_HANDLERS, concurrency=concurrency)
+    print("=" * 60)
+    print(f"Enhancement worker {worker.worker_id} running {concurrency} concurrent jobs")
+    print("=" * 60)
+    try:
+        await worker.run_forever()
+    finally:
+        await worker.stop()
+        await llm_ops.aclose()
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Process queued resume enhancement jobs")
+    parser.add_argument("--concurrency", type=int, default=int(os.environ.get("ENHANCE_WORKER_CONCURRENCY", "8")),
+                        help="jobs processed concurrently by this worker")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_worker(args.concurrency))
+    except KeyboardInterrupt:
+        print("\nWorker stopped")
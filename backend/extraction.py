@@ -0,0 +1,206 @@
+"""
+Resume text extraction running in a dedicated process pool
+
+PyPDF2 and python-docx are imported inside the extractors, so only the
+worker processes load them.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import tempfile
+from collections import Counter
+from contextlib import asynccontextmanager
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, NamedTuple
+
+from worker_pool import WorkerPool
+
+logger = logging.getLogger(__name__)
+
+# Pool configuration
+EXTRACTION_WORKERS = int(os.environ.get("EXTRACTION_WORKERS", os.cpu_count() or 1))
+EXTRACTION_QUEUE_SIZE = int(os.environ.get("EXTRACTION_QUEUE_SIZE", "16"))
+EXTRACTION_RETRY_AFTER = int(os.environ.get("EXTRACTION_RETRY_AFTER", "5"))
+
+# Upload limits
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.environ.get("MAX_PDF_PAGES", "50"))
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# A line at the top or bottom of this many PDF pages (or of every page, for
+# shorter documents) is a running header/footer; only its first copy is kept
+PAGE_REPEAT_THRESHOLD = int(os.environ.get("PAGE_REPEAT_THRESHOLD", "3"))
+# Lines at each end of a page that may be a header, footer or page number
+PAGE_EDGE_LINES = 2
+PAGE_NUMBER = re.compile(r'^(page\s*)?\d{1,3}(\s*(of|/)\s*\d{1,3})?$|^-\s*\d{1,3}\s*-$', re.IGNORECASE)
+
+
+class ExtractionError(Exception):
+    """Raised when a document cannot be parsed."""
+
+
+class ExtractionQueueFull(Exception):
+    """Raised when the extraction pool cannot admit more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Extraction queue is full")
+        self.retry_after = retry_after
+
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds MAX_UPLOAD_BYTES."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds the {max_bytes // (1024 * 1024)} MB upload limit")
+        self.max_bytes = max_bytes
+
+
+class SpooledUpload(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+
+@asynccontextmanager
+async def spooled_upload(upload, max_bytes: int = MAX_UPLOAD_BYTES):
+    """Copy an UploadFile to a temporary file on disk chunk by chunk.
+
+    Yields a ``SpooledUpload`` (path, size and SHA-256 of the content) and removes
+    the file on exit. Only one chunk is held in memory at a time;
+    ``UploadTooLarge`` is raised as soon as the cap is crossed.
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    suffix = os.path.splitext(upload.filename or "")[1]
+    tmp = tempfile.NamedTemporaryFile(prefix="resume-", suffix=suffix, delete=False)
+    try:
+        size = 0
+        digest = hashlib.sha256()
+        with tmp:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(max_bytes)
+                digest.update(chunk)
+                tmp.write(chunk)
+        yield SpooledUpload(tmp.name, size, digest.hexdigest())
+    finally:
+        os.unlink(tmp.name)
+
+
+def iter_pdf_pages(path: str, max_pages: int = MAX_PDF_PAGES):
+    """Yield the text of each page, reading the PDF lazily from disk."""
+    from PyPDF2 import PdfReader
+    with open(path, 'rb') as fh:
+        reader = PdfReader(fh)
+        for index, page in enumerate(reader.pages):
+            if index >= max_pages:
+                logger.info(f"PDF truncated to the first {max_pages} pages")
+                break
+            yield page.extract_text() or ""
+
+
+def _edge_indexes(lines: List[str]) -> List[int]:
+    """Indexes of the first and last PAGE_EDGE_LINES non-empty lines of a page."""
+    filled = [i for i, line in enumerate(lines) if line]
+    return sorted(set(filled[:PAGE_EDGE_LINES] + filled[-PAGE_EDGE_LINES:]))
+
+
+def strip_page_furniture(pages: List[str]) -> List[str]:
+    """Blank out page numbers and running headers/footers at the edges of each page.
+
+    Only the first and last PAGE_EDGE_LINES non-empty lines of a page are
+    candidates; a repeated edge line keeps its first copy. Lines inside a
+    page are never removed, even when they repeat.
+    """
+    if len(pages) < 2:
+        return pages
+    pages_lines = [page.split("\n") for page in pages]
+    keys = [[" ".join(line.split()) for line in lines] for lines in pages_lines]
+    edges = [_edge_indexes(page_keys) for page_keys in keys]
+    counts = Counter(key for page_keys, indexes in zip(keys, edges) for key in {page_keys[i] for i in indexes})
+    repeats = max(2, min(PAGE_REPEAT_THRESHOLD, len(pages)))
+    seen = set()
+    for lines, page_keys, indexes in zip(pages_lines, keys, edges):
+        for i in indexes:
+            key = page_keys[i]
+            if PAGE_NUMBER.match(key) or (counts[key] >= repeats and key in seen):
+                lines[i] = ""
+            seen.add(key)
+    return ["\n".join(lines) for lines in pages_lines]
+
+
+def extract_text_from_pdf(path: str, max_pages: int = MAX_PDF_PAGES) -> str:
+    try:
+        return "\n".join(strip_page_furniture(list(iter_pdf_pages(path, max_pages)))) + "\n"
+    except Exception as e:
+        logger.error(f"Error extracting PDF: {e}")
+        raise ExtractionError("Failed to extract text from PDF")
+
+
+def extract_text_from_docx(path: str) -> str:
+    from docx import Document
+    try:
+        doc = Document(path)
+        text = "\n".join([para.text for para in doc.paragraphs])
+        return text
+    except Exception as e:
+        logger.error(f"Error extracting DOCX: {e}")
+        raise ExtractionError("Failed to extract text from DOCX")
+
+
+EXTRACTORS = {
+    "pdf": extract_text_from_pdf,
+    "docx": extract_text_from_docx,
+}
+
+
+def init_extraction_worker():
+    """Parse a blank PDF and load python-docx's default template, so a worker's
+    first upload does not pay for their lazy loading."""
+    from PyPDF2 import PdfReader, PdfWriter
+    from docx import Document
+
+    buffer = io.BytesIO()
+    writer = PdfWriter()
+    writer.add_blank_page(width=72, height=72)
+    writer.write(buffer)
+    buffer.seek(0)
+    for page in PdfReader(buffer).pages:
+        page.extract_text()
+    Document()
+
+
+class ExtractionPool(WorkerPool):
+    """Extraction workers with a bounded admission queue.
+
+    At most ``workers + queue_size`` extractions are admitted at once; further
+    requests are rejected immediately with ``ExtractionQueueFull`` so callers
+    can answer 503 instead of piling work onto the event loop.
+    """
+
+    def __init__(self, workers: int = EXTRACTION_WORKERS, queue_size: int = EXTRACTION_QUEUE_SIZE,
+                 retry_after: int = EXTRACTION_RETRY_AFTER):
+        super().__init__("Extraction", workers, init_extraction_worker)
+        self.capacity = self.workers + max(0, queue_size)
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    async def extract(self, kind: str, path: str) -> str:
+        """Extract text from the file at ``path`` of the given kind ('pdf' or 'docx')."""
+        if self.in_flight >= self.capacity:
+            raise ExtractionQueueFull(self.retry_after)
+
+        self.in_flight += 1
+        try:
+            return await self.run(EXTRACTORS[kind], path)
+        except BrokenProcessPool:
+            raise ExtractionError(f"Failed to extract text from {kind.upper()}")
+        finally:
+            self.in_flight -= 1
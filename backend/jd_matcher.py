@@ -0,0 +1,125 @@
+"""
+Job description matching with hashed TF-IDF sparse vectors
+"""
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+from scipy import sparse
+
+# Bump when tokenization or hashing changes so cached resume vectors are rebuilt
+VECTOR_VERSION = 1
+N_FEATURES = 2 ** 20
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+
+STOP_WORDS = frozenset("""
+a about above after again all also am an and any are as at be been before being below between both but by
+can could did do does doing down during each etc few for from further had has have having he her here hers
+him his how i if in into is it its itself just me more most my no nor not now of off on once only or other
+our ours out over own per same she should so some such than that the their them then there these they this
+those through to too under until up very via was we were what when where which while who whom why will with
+within without would you your yours
+able ability across candidate candidates experience including job looking must plus preferred required
+requirements responsibilities role strong team using work working year years
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in STOP_WORDS and not t.isdigit()]
+
+
+def extract_terms(text: str) -> List[str]:
+    """Unigrams plus adjacent-token bigrams ("machine learning")."""
+    tokens = tokenize(text)
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def _feature(term: str) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(term.encode('utf-8')) % N_FEATURES
+
+
+def _count_row(terms: List[str]):
+    counts = Counter(_feature(t) for t in terms)
+    indices = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+    values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+    order = np.argsort(indices)
+    return indices[order], values[order]
+
+
+def vectorize_resume(section_texts: List[str]) -> Dict[str, Any]:
+    """Build the cacheable term-count vectors for a resume, one row per section.
+
+    The result is plain lists so it can be stored on the resume document.
+    """
+    rows = []
+    for text in section_texts:
+        indices, values = _count_row(extract_terms(text))
+        rows.append({"i": indices.tolist(), "c": values.astype(np.int64).tolist()})
+    return {"version": VECTOR_VERSION, "n_features": N_FEATURES, "rows": rows}
+
+
+def _to_matrix(vector: Dict[str, Any]) -> sparse.csr_matrix:
+    indptr = [0]
+    indices, data = [], []
+    for row in vector["rows"]:
+        indices.extend(row["i"])
+        data.extend(row["c"])
+        indptr.append(len(indices))
+    return sparse.csr_matrix(
+        (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int64), np.asarray(indptr)),
+        shape=(len(vector["rows"]), vector["n_features"])
+    )
+
+
+def match_job_description(resume_vector: Dict[str, Any], job_description: str, top_n: int = 25) -> Dict[str, Any]:
+    """Score a job description against a cached resume vector.
+
+    Resume sections and the job description form the document set for IDF,
+    so terms that show up everywhere (boilerplate) carry little weight while
+    terms specific to the JD or a single section dominate. Only the job
+    description is tokenized here; the resume side comes from the cache.
+    """
+    jd_terms = extract_terms(job_description)
+    if not jd_terms or not resume_vector["rows"]:
+        return {"similarity": 0.0, "score": 0, "matched_terms": [], "missing_terms": []}
+
+    sections = _to_matrix(resume_vector)
+    jd_indices, jd_counts = _count_row(jd_terms)
+
+    # Work only on the columns either side uses
+    columns = np.union1d(np.unique(sections.indices), jd_indices)
+    section_counts = sections[:, columns]
+    jd_dense = np.zeros(len(columns))
+    jd_dense[np.searchsorted(columns, jd_indices)] = jd_counts
+    resume_dense = np.asarray(section_counts.sum(axis=0)).ravel()
+
+    n_docs = section_counts.shape[0] + 1
+    df = np.asarray((section_counts > 0).sum(axis=0)).ravel() + (jd_dense > 0)
+    idf = np.log((1 + n_docs) / (1 + df)) + 1
+
+    resume_weights = np.where(resume_dense > 0, 1 + np.log(np.maximum(resume_dense, 1)), 0) * idf
+    jd_weights = np.where(jd_dense > 0, 1 + np.log(np.maximum(jd_dense, 1)), 0) * idf
+
+    norm = np.linalg.norm(resume_weights) * np.linalg.norm(jd_weights)
+    similarity = float(resume_weights @ jd_weights / norm) if norm else 0.0
+
+    # Rank the JD's own terms by weight to report what matched and what is missing
+    position = {int(c): k for k, c in enumerate(columns)}
+    ranked = sorted(
+        set(jd_terms),
+        key=lambda t: (-jd_weights[position[_feature(t)]], t)
+    )
+    matched = [t for t in ranked if resume_dense[position[_feature(t)]] > 0]
+    # Bigrams missing from the resume are mostly accidental adjacency, so only report words
+    missing = [t for t in ranked if ' ' not in t and resume_dense[position[_feature(t)]] == 0]
+
+    return {
+        "similarity": round(similarity, 4),
+        "score": int(round(similarity * 100)),
+        "matched_terms": matched[:top_n],
+        "missing_terms": missing[:top_n],
+    }
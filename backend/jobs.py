@@ -0,0 +1,211 @@
+"""
+MongoDB-backed job queue with leases, retries and visibility timeouts
+"""
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pymongo import IndexModel, ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Queue configuration
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "120"))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_DELAY_SECONDS = int(os.environ.get("JOB_RETRY_DELAY_SECONDS", "5"))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", "1"))
+
+
+class JobQueue:
+    """Jobs live in one collection and move queued -> running -> succeeded/failed.
+
+    A claim sets ``available_at`` to the end of the worker's lease. If the
+    worker dies without finishing, the lease expires and the job becomes
+    visible to other workers again; each claim counts as an attempt, and a
+    job that runs out of attempts is marked failed.
+    """
+
+    def __init__(self, collection, lease_seconds: int = JOB_LEASE_SECONDS,
+                 max_attempts: int = JOB_MAX_ATTEMPTS, retry_delay: int = JOB_RETRY_DELAY_SECONDS):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+
+    def indexes(self) -> List[IndexModel]:
+        return [
+            IndexModel("id", name="id_1", unique=True),
+            IndexModel([("status", 1), ("available_at", 1)], name="status_1_available_at_1"),
+        ]
+
+    async def ensure_indexes(self):
+        await self.collection.create_indexes(self.indexes())
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], user_id: str) -> str:
+        now = datetime.now(timezone.utc)
+        job_id = str(uuid.uuid4())
+        await self.collection.insert_one({
+            "id": job_id,
+            "kind": kind,
+            "payload": payload,
+            "user_id": user_id,
+            "status": "queued",
+            "attempts": 0,
+            "available_at": now,
+            "created_at": now,
+            "updated_at": now,
+            "result": None,
+            "error": None,
+        })
+        return job_id
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Lease the next available job (queued, or running with an expired lease)."""
+        while True:
+            now = datetime.now(timezone.utc)
+            job = await self.collection.find_one_and_update(
+                {"status": {"$in": ["queued", "running"]}, "available_at": {"$lte": now}},
+                {
+                    "$set": {
+                        "status": "running",
+                        "worker_id": worker_id,
+                        "available_at": now + timedelta(seconds=self.lease_seconds),
+                        "updated_at": now,
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("available_at", 1)],
+                projection={"_id": 0},
+                return_document=ReturnDocument.AFTER
+            )
+            if job is None:
+                return None
+            if job["attempts"] <= self.max_attempts:
+                return job
+            # Lease expired on its final attempt (worker crashed or hung)
+            await self._finish(job["id"], worker_id, "failed", error=job.get("error") or "Lease expired")
+
+    async def heartbeat(self, job_id: str, worker_id: str) -> bool:
+        """Extend the lease; returns False if the job is no longer ours."""
+        now = datetime.now(timezone.utc)
+        result = await self.collection.update_one(
+            {"id": job_id, "worker_id": worker_id, "status": "running"},
+            {"$set": {"available_at": now + timedelta(seconds=self.lease_seconds), "updated_at": now}}
+        )
+        return result.modified_count == 1
+
+    async def complete(self, job_id: str, worker_id: str, result: Any):
+        await self._finish(job_id, worker_id, "succeeded", result=result)
+
+    async def fail(self, job: Dict[str, Any], worker_id: str, error: str):
+        """Requeue with exponential backoff, or mark failed after the last attempt."""
+        if job["attempts"] >= self.max_attempts:
+            await self._finish(job["id"], worker_id, "failed", error=error)
+            return
+        now = datetime.now(timezone.utc)
+        delay = self.retry_delay * 2 ** (job["attempts"] - 1)
+        await self.collection.update_one(
+            {"id": job["id"], "worker_id": worker_id},
+            {"$set": {
+                "status": "queued",
+                "available_at": now + timedelta(seconds=delay),
+                "updated_at": now,
+                "error": error,
+            }}
+        )
+
+    async def _finish(self, job_id: str, worker_id: str, status: str, result: Any = None, error: Optional[str] = None):
+        await self.collection.update_one(
+            {"id": job_id, "worker_id": worker_id},
+            {"$set": {
+                "status": status,
+                "result": result,
+                "error": error,
+                "updated_at": datetime.now(timezone.utc),
+            }}
+        )
+
+
+JobHandler = Callable[[Dict[str, Any], str], Awaitable[Any]]
+
+
+class JobWorker:
+    """Runs ``concurrency`` claim loops against a JobQueue until stopped."""
+
+    def __init__(self, queue: JobQueue, handlers: Dict[str, JobHandler], concurrency: int = 4,
+                 poll_interval: float = JOB_POLL_INTERVAL):
+        self.queue = queue
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._stopping = asyncio.Event()
+        self._tasks = []
+
+    def start(self):
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._loop()) for _ in range(self.concurrency)]
+
+    async def stop(self):
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def run_forever(self):
+        self.start()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _loop(self):
+        while not self._stopping.is_set():
+            try:
+                job = await self.queue.claim(self.worker_id)
+            except Exception as e:
+                logger.error(f"Job claim failed: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._stopping.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                # Recording the outcome failed (e.g. a Mongo blip); the lease re-exposes the job
+                logger.error(f"Job {job['id']} ({job['kind']}) could not be recorded: {e}")
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.queue.lease_seconds / 3)
+            if not await self.queue.heartbeat(job_id, self.worker_id):
+                return
+
+    async def _run(self, job: Dict[str, Any]):
+        handler = self.handlers.get(job["kind"])
+        if handler is None:
+            await self.queue.fail({**job, "attempts": self.queue.max_attempts}, self.worker_id,
+                                  f"No handler for job kind '{job['kind']}'")
+            return
+
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            result = await handler(job["payload"], job["user_id"])
+        except asyncio.CancelledError:
+            # Shutting down: leave the lease to expire so another worker retries
+            raise
+        except Exception as e:
+            logger.error(f"Job {job['id']} ({job['kind']}) attempt {job['attempts']} failed: {e}")
+            await self.queue.fail(job, self.worker_id, str(e))
+        else:
+            await self.queue.complete(job["id"], self.worker_id, result)
+        finally:
+            heartbeat.cancel()
@@ -0,0 +1,106 @@
+"""
+Aho-Corasick keyword matcher for ATS scoring
+"""
+import json
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+DEFAULT_KEYWORDS = [
+    "python", "javascript", "react", "node", "fastapi", "mongodb", "sql",
+    "aws", "docker", "kubernetes", "git", "agile", "scrum", "ci/cd",
+    "leadership", "communication", "teamwork", "problem-solving",
+    "bachelor", "master", "degree", "certified", "manager", "engineer"
+]
+
+
+def load_keywords(path: str) -> List[str]:
+    """Load a keyword taxonomy from a JSON list or a newline-delimited text file
+    ('#' starts a comment line). Raises ValueError if it has no keywords."""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.json'):
+            keywords = json.load(f)
+        else:
+            keywords = [line.strip() for line in f if line.strip() and not line.lstrip().startswith('#')]
+    if not isinstance(keywords, list) or not any(isinstance(k, str) and k.strip() for k in keywords):
+        raise ValueError(f"Keyword taxonomy {path} has no keywords")
+    return keywords
+
+
+class KeywordMatcher:
+    """Case-insensitive multi-keyword matcher with word-boundary semantics.
+
+    The automaton is built once; each scan walks the text a single time no
+    matter how many keywords there are. A keyword only matches when it is not
+    glued to surrounding letters or digits, so "git" does not match inside
+    "digital". Keywords that start or end with punctuation (e.g. "c++")
+    only require the boundary on their alphanumeric edges.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = list(dict.fromkeys(k.strip().lower() for k in keywords if k.strip()))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        for index, keyword in enumerate(self.keywords):
+            self._add(keyword, index)
+        self._link()
+
+    def __len__(self):
+        return len(self.keywords)
+
+    def _add(self, keyword: str, index: int):
+        state = 0
+        for ch in keyword:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(index)
+
+    def _link(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[nxt] = self._goto[fallback].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def finditer(self, text: str) -> Iterator[Tuple[str, int]]:
+        """Yield ``(keyword, start)`` for every whole-word occurrence.
+
+        Positions index into ``text.lower()``, which matches ``text`` for
+        ASCII input.
+        """
+        text = text.lower()
+        goto, fail, out, keywords = self._goto, self._fail, self._out, self.keywords
+        length = len(text)
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            for index in out[state]:
+                keyword = keywords[index]
+                start = end - len(keyword) + 1
+                if keyword[0].isalnum() and start > 0 and text[start - 1].isalnum():
+                    continue
+                if keyword[-1].isalnum() and end + 1 < length and text[end + 1].isalnum():
+                    continue
+                yield keyword, start
+
+    def find_all(self, text: str) -> Dict[str, List[int]]:
+        """Return matched keywords mapped to their start positions."""
+        matches: Dict[str, List[int]] = {}
+        for keyword, start in self.finditer(text):
+            matches.setdefault(keyword, []).append(start)
+        return matches
@@ -0,0 +1,142 @@
+"""
+Compiled {{placeholder}} templates with repeated blocks, reloaded when the file changes
+"""
+import hashlib
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+# {{name}} slot, {{#name}}...{{/name}} repeated block, {{.}} the current list item.
+# Block tags alone on a line take the whole line, so they leave no blank lines behind.
+TAG_RE = re.compile(
+    r'^[ \t]*\{\{([#/])([\w.]+)\}\}[ \t]*(?:\n|\Z)'
+    r'|\{\{([#/]?)([\w.]+)\}\}',
+    re.MULTILINE
+)
+
+
+class TemplateError(Exception):
+    """Raised when a template's blocks are not properly nested."""
+
+
+class Slot:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+class Block:
+    __slots__ = ("name", "fragments")
+
+    def __init__(self, name: str, fragments: List["Fragment"]):
+        self.name = name
+        self.fragments = fragments
+
+
+Fragment = Union[str, Slot, Block]
+
+
+def _lookup(name: str, scopes: List[Any]) -> Any:
+    for scope in reversed(scopes):
+        if name == ".":
+            return scope
+        if isinstance(scope, dict) and name in scope:
+            return scope[name]
+    return ""
+
+
+class CompiledTemplate:
+    """A template parsed into literal chunks, slots and blocks.
+
+    ``render`` walks the fragments once and joins the pieces, instead of one
+    ``str.replace`` pass over the whole template per placeholder. Values are
+    inserted as given (escape them beforehand); a slot with no value renders
+    empty. A block renders once per item of a list value, with the item's
+    keys in scope, and not at all for an empty or missing value.
+    """
+
+    def __init__(self, source: str):
+        self.fragments = self._parse(source)
+
+    @staticmethod
+    def _parse(source: str) -> List[Fragment]:
+        root: List[Fragment] = []
+        stack = [("", root)]
+        pos = 0
+        for m in TAG_RE.finditer(source):
+            if m.start() > pos:
+                stack[-1][1].append(source[pos:m.start()])
+            pos = m.end()
+            kind, name = (m.group(1), m.group(2)) if m.group(2) else (m.group(3), m.group(4))
+            if kind == "#":
+                block = Block(name, [])
+                stack[-1][1].append(block)
+                stack.append((name, block.fragments))
+            elif kind == "/":
+                if stack[-1][0] != name:
+                    raise TemplateError(f"Unexpected {{{{/{name}}}}}")
+                stack.pop()
+            else:
+                stack[-1][1].append(Slot(name))
+        if len(stack) > 1:
+            raise TemplateError(f"Unclosed {{{{#{stack[-1][0]}}}}}")
+        if pos < len(source):
+            root.append(source[pos:])
+        return root
+
+    def render(self, context: Dict[str, Any]) -> str:
+        out: List[str] = []
+        self._render(self.fragments, [context], out)
+        return "".join(out)
+
+    def _render(self, fragments: List[Fragment], scopes: List[Any], out: List[str]):
+        for fragment in fragments:
+            if isinstance(fragment, str):
+                out.append(fragment)
+            elif isinstance(fragment, Slot):
+                out.append(str(_lookup(fragment.name, scopes)))
+            else:
+                items = _lookup(fragment.name, scopes)
+                if isinstance(items, dict):
+                    items = [items]
+                for item in items or ():
+                    scopes.append(item)
+                    self._render(fragment.fragments, scopes, out)
+                    scopes.pop()
+
+
+class TemplateFile:
+    """A CompiledTemplate for a file, recompiled only when its mtime changes."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._mtime: Optional[int] = None
+        self._template: Optional[CompiledTemplate] = None
+        self._digest = ""
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    source = self.path.read_text(encoding='utf-8')
+                    self._template = CompiledTemplate(source)
+                    self._digest = hashlib.sha256(source.encode('utf-8')).hexdigest()[:12]
+                    self._mtime = mtime
+
+    def get(self) -> CompiledTemplate:
+        self._refresh()
+        return self._template
+
+    @property
+    def digest(self) -> str:
+        """Short hash of the current template source, for cache keys."""
+        self._refresh()
+        return self._digest
+
+    def render(self, context: Dict[str, Any]) -> str:
+        return self.get().render(context)
@@ -0,0 +1,192 @@
+"""
+Rate limiting, retry with backoff and circuit breaking for LLM providers
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LLMError(Exception):
+    """An LLM request failed and should not be retried by the caller as-is."""
+
+    def __init__(self, provider: str, message: str):
+        super().__init__(f"{provider}: {message}")
+        self.provider = provider
+
+
+class ProviderUnavailable(LLMError):
+    """The provider is throttling us or down; retry after ``retry_after`` seconds."""
+
+    def __init__(self, provider: str, message: str, retry_after: float):
+        super().__init__(provider, message)
+        self.retry_after = retry_after
+
+
+def status_code_of(error: Exception) -> Optional[int]:
+    """HTTP status carried by an OpenAI (status_code), google-api-core (code) or urllib (code) error."""
+    for attr in ("status_code", "code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def retry_after_of(error: Exception) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or getattr(error, "headers", None)
+    try:
+        return float(headers.get("retry-after")) if headers and headers.get("retry-after") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(error: Exception) -> bool:
+    status = status_code_of(error)
+    if status is not None:
+        return status == 429 or status >= 500
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    # openai.APITimeoutError / APIConnectionError and friends carry no status
+    return type(error).__name__.endswith(("TimeoutError", "ConnectionError"))
+
+
+class TokenBucket:
+    """Token bucket whose refill rate backs off on throttling.
+
+    ``penalize`` halves the rate (down to 10% of the quota) when the provider
+    answers 429; ``reward`` creeps it back up on each success.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.max_rate = rate_per_minute / 60.0
+        self.rate = self.max_rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        async with self._lock:
+            self._refill()
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+    def penalize(self):
+        self._refill()
+        self.rate = max(self.max_rate * 0.1, self.rate / 2)
+
+    def reward(self):
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.max_rate * 0.05)
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and fails fast for
+    ``reset_timeout`` seconds, then lets a single trial call through."""
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self._trial_in_flight or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self._trial_in_flight = False
+
+    def release_trial(self):
+        """Free the half-open trial slot of a call that ended without an answer (e.g. cancelled)."""
+        self._trial_in_flight = False
+
+
+class ProviderGateway:
+    """Every provider call goes through ``call``: rate limit, then the request,
+    retried with jittered exponential backoff on 429/5xx/timeouts, with a
+    circuit breaker that fails fast while the provider is down. A Retry-After
+    longer than ``max_delay`` is passed on in ProviderUnavailable instead of
+    being waited out."""
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int = 10, max_retries: int = 4,
+                 base_delay: float = 1.0, max_delay: float = 30.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    async def call(self, request: Callable[[], Awaitable[Any]]) -> Any:
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise ProviderUnavailable(self.name, "circuit open", self.breaker.retry_after())
+
+            try:
+                await self.bucket.acquire()
+                result = await request()
+            except Exception as e:
+                if not is_retryable(e):
+                    # The provider answered; a bad request says nothing about its health
+                    self.breaker.record_success()
+                    raise LLMError(self.name, str(e)) from e
+
+                self.breaker.record_failure()
+                if status_code_of(e) == 429:
+                    self.bucket.penalize()
+
+                retry_after = retry_after_of(e)
+                if retry_after and retry_after > self.max_delay:
+                    raise ProviderUnavailable(self.name, str(e), retry_after) from e
+                delay = retry_after or random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                if attempt == self.max_retries:
+                    raise ProviderUnavailable(self.name, str(e), delay) from e
+                logger.warning(f"{self.name} request failed ({e}), retry {attempt + 1} in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            except BaseException:
+                # Cancelled before the provider answered: says nothing about its health
+                self.breaker.release_trial()
+                raise
+            else:
+                self.breaker.record_success()
+                self.bucket.reward()
+                return result
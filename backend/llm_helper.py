@@ -1,54 +1,270 @@
 """
 Simple LLM helper to replace emergentintegrations
 """
+import asyncio
+import hashlib
 import os
-from openai import OpenAI
-import google.generativeai as genai
+from typing import TYPE_CHECKING
 
+from llm_gateway import LLMError, ProviderGateway, ProviderUnavailable  # noqa: F401
+from prompt_builder import Prompt, build_prompt, count_tokens, record_usage
 
-async def enhance_with_openai(text: str) -> str:
-    """Enhance resume using OpenAI GPT-4"""
-    try:
-        api_key = os.environ.get('OPENAI_API_KEY') or os.environ.get('EMERGENT_LLM_KEY')
-        if not api_key:
-            print("Warning: No OpenAI API key found, returning original text")
-            return text
-            
-        client = OpenAI(api_key=api_key)
-        
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are an expert resume writer. Enhance the given resume content to be more ATS-friendly while maintaining accuracy. Focus on clear, concise language, strong action verbs, and quantifiable achievements."},
-                {"role": "user", "content": f"Enhance this resume content for ATS optimization:\n\n{text}"}
-            ]
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+OPENAI_MODEL = "gpt-4o"
+GEMINI_MODEL = "gemini-pro"
+
+# Bump when a prompt changes so cached responses for the old prompt are not reused
+PROMPT_VERSIONS = {"openai": 2, "gemini": 2}
+MODELS = {"openai": OPENAI_MODEL, "gemini": GEMINI_MODEL}
+
+OPENAI_SYSTEM_PROMPT = "You are an expert resume writer. Enhance the given resume content to be more ATS-friendly while maintaining accuracy. Focus on clear, concise language, strong action verbs, and quantifiable achievements."
+
+GEMINI_PROMPT = """You are an expert career coach and resume optimizer. Improve the given resume content with industry-specific keywords, better formatting, and professional language.
+
+Optimize this resume content for better ATS compatibility:
+
+{text}"""
+
+# Client configuration
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", "60"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_CONCURRENCY = int(os.environ.get("OPENAI_MAX_CONCURRENCY", "50"))
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "50"))
+
+# Long-lived clients, created on first use and shared by every request. The
+# provider SDKs are slow to import, so they are only loaded when needed
+_openai_client = None
+_gemini_model = None
+_openai_slots = asyncio.Semaphore(OPENAI_MAX_CONCURRENCY)
+_gemini_slots = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+
+# Provider quotas and failure handling; the gateways own retries, so the SDKs' own are disabled
+OPENAI_REQUESTS_PER_MINUTE = float(os.environ.get("OPENAI_REQUESTS_PER_MINUTE", "500"))
+GEMINI_REQUESTS_PER_MINUTE = float(os.environ.get("GEMINI_REQUESTS_PER_MINUTE", "60"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", "1"))
+LLM_BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", "30"))
+LLM_BREAKER_THRESHOLD = int(os.environ.get("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.environ.get("LLM_BREAKER_RESET_SECONDS", "30"))
+
+
+def _gateway(name: str, requests_per_minute: float, burst: int) -> ProviderGateway:
+    return ProviderGateway(
+        name,
+        rate_per_minute=requests_per_minute,
+        burst=burst,
+        max_retries=LLM_MAX_RETRIES,
+        base_delay=LLM_BACKOFF_BASE,
+        max_delay=LLM_BACKOFF_MAX,
+        failure_threshold=LLM_BREAKER_THRESHOLD,
+        reset_timeout=LLM_BREAKER_RESET_SECONDS
+    )
+
+
+openai_gateway = _gateway("openai", OPENAI_REQUESTS_PER_MINUTE, OPENAI_MAX_CONCURRENCY)
+gemini_gateway = _gateway("gemini", GEMINI_REQUESTS_PER_MINUTE, GEMINI_MAX_CONCURRENCY)
+
+
+def cache_key(provider: str, text: str) -> str:
+    """Key identifying a response: provider, model, prompt version and input hash."""
+    digest = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    return f"{provider}:{MODELS[provider]}:p{PROMPT_VERSIONS[provider]}:{digest}"
+
+
+def _openai_api_key():
+    return os.environ.get('OPENAI_API_KEY') or os.environ.get('EMERGENT_LLM_KEY')
+
+
+def _gemini_api_key():
+    return os.environ.get('GEMINI_API_KEY') or os.environ.get('EMERGENT_LLM_KEY')
+
+
+def load_providers():
+    """Import the SDK of each provider that has an API key; unused providers are never loaded."""
+    if _openai_api_key():
+        import openai  # noqa: F401
+    if _gemini_api_key():
+        import google.generativeai  # noqa: F401
+
+
+def _get_openai_client(api_key: str) -> "AsyncOpenAI":
+    global _openai_client
+    if _openai_client is None:
+        import httpx
+        from openai import AsyncOpenAI
+        _openai_client = AsyncOpenAI(
+            api_key=api_key,
+            timeout=LLM_TIMEOUT,
+            max_retries=0,
+            http_client=httpx.AsyncClient(
+                timeout=LLM_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=LLM_MAX_CONNECTIONS
+                )
+            )
         )
-        
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"OpenAI enhancement error: {e}")
+    return _openai_client
+
+
+def _get_gemini_model(api_key: str):
+    global _gemini_model
+    if _gemini_model is None:
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        _gemini_model = genai.GenerativeModel(GEMINI_MODEL)
+    return _gemini_model
+
+
+async def aclose():
+    """Close pooled connections; called on application shutdown."""
+    global _openai_client, _gemini_model
+    if _openai_client is not None:
+        await _openai_client.close()
+    _openai_client = None
+    _gemini_model = None
+
+
+def _record_usage(provider: str, prompt: Prompt, output: str, tokens_in=None, tokens_out=None):
+    """Record a call's usage, preferring the provider's own (billed) counts when it reports them."""
+    record_usage(provider, tokens_in or prompt.tokens, tokens_out or count_tokens(output), prompt.original_tokens)
+
+
+def _openai_messages(text: str):
+    return [
+        {"role": "system", "content": OPENAI_SYSTEM_PROMPT},
+        {"role": "user", "content": f"Enhance this resume content for ATS optimization:\n\n{text}"}
+    ]
+
+
+def _stream_request(slots: asyncio.Semaphore, open_stream):
+    """Gateway request that holds a provider slot for one attempt, and past it only
+    if the stream opens; the caller releases it once the stream is consumed."""
+    async def request():
+        await slots.acquire()
+        try:
+            return await open_stream()
+        except BaseException:
+            slots.release()
+            raise
+    return request
+
+
+async def enhance_with_openai(text: str) -> str:
+    """Enhance resume using OpenAI GPT-4
+
+    Raises LLMError (ProviderUnavailable when throttled or down) instead of
+    passing the original text off as an enhancement.
+    """
+    api_key = _openai_api_key()
+    if not api_key:
+        print("Warning: No OpenAI API key found, returning original text")
         return text
 
+    client = _get_openai_client(api_key)
+    prompt = build_prompt(text, "openai")
+
+    async def request():
+        async with _openai_slots:
+            return await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=_openai_messages(prompt.text)
+            )
+
+    response = await openai_gateway.call(request)
+    enhanced = response.choices[0].message.content
+    usage = response.usage
+    _record_usage("openai", prompt, enhanced, usage and usage.prompt_tokens, usage and usage.completion_tokens)
+    return enhanced
+
 
 async def enhance_with_gemini(text: str) -> str:
-    """Enhance resume using Google Gemini"""
+    """Enhance resume using Google Gemini, raising LLMError like enhance_with_openai"""
+    api_key = _gemini_api_key()
+    if not api_key:
+        print("Warning: No Gemini API key found, returning original text")
+        return text
+
+    model = _get_gemini_model(api_key)
+    prompt = build_prompt(text, "gemini")
+
+    async def request():
+        async with _gemini_slots:
+            return await model.generate_content_async(
+                GEMINI_PROMPT.format(text=prompt.text),
+                request_options={"timeout": LLM_TIMEOUT}
+            )
+
+    response = await gemini_gateway.call(request)
+    enhanced = response.text
+    usage = getattr(response, "usage_metadata", None)
+    _record_usage("gemini", prompt, enhanced, usage and usage.prompt_token_count, usage and usage.candidates_token_count)
+    return enhanced
+
+
+async def stream_openai(text: str):
+    """Yield the OpenAI enhancement as it is generated.
+
+    Opening the stream goes through the gateway (rate limit, retries, breaker);
+    a failure after output has started is raised as LLMError so partial output
+    is never mistaken for a result.
+    """
+    api_key = _openai_api_key()
+    if not api_key:
+        print("Warning: No OpenAI API key found, returning original text")
+        yield text
+        return
+
+    client = _get_openai_client(api_key)
+    prompt = build_prompt(text, "openai")
+    output, usage = [], None
+    # The slot is taken per attempt, so retries back off without holding it
+    stream = await openai_gateway.call(_stream_request(_openai_slots, lambda: client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=_openai_messages(prompt.text),
+        stream=True,
+        stream_options={"include_usage": True}
+    )))
     try:
-        api_key = os.environ.get('GEMINI_API_KEY') or os.environ.get('EMERGENT_LLM_KEY')
-        if not api_key:
-            print("Warning: No Gemini API key found, returning original text")
-            return text
-            
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-pro')
-        
-        prompt = f"""You are an expert career coach and resume optimizer. Improve the given resume content with industry-specific keywords, better formatting, and professional language.
+        async for chunk in stream:
+            usage = chunk.usage or usage
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                output.append(delta)
+                yield delta
+    except Exception as e:
+        raise LLMError("openai", f"stream interrupted: {e}") from e
+    finally:
+        _openai_slots.release()
+    _record_usage("openai", prompt, "".join(output), usage and usage.prompt_tokens, usage and usage.completion_tokens)
 
-Optimize this resume content for better ATS compatibility:
 
-{text}"""
-        
-        response = model.generate_content(prompt)
-        return response.text
+async def stream_gemini(text: str):
+    """Yield the Gemini enhancement as it is generated, with the same error handling as stream_openai."""
+    api_key = _gemini_api_key()
+    if not api_key:
+        print("Warning: No Gemini API key found, returning original text")
+        yield text
+        return
+
+    model = _get_gemini_model(api_key)
+    prompt = build_prompt(text, "gemini")
+    output, usage = [], None
+    response = await gemini_gateway.call(_stream_request(_gemini_slots, lambda: model.generate_content_async(
+        GEMINI_PROMPT.format(text=prompt.text),
+        stream=True,
+        request_options={"timeout": LLM_TIMEOUT}
+    )))
+    try:
+        async for chunk in response:
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            if chunk.text:
+                output.append(chunk.text)
+                yield chunk.text
     except Exception as e:
-        print(f"Gemini enhancement error: {e}")
-        return text
+        raise LLMError("gemini", f"stream interrupted: {e}") from e
+    finally:
+        _gemini_slots.release()
+    _record_usage("gemini", prompt, "".join(output), usage and usage.prompt_token_count, usage and usage.candidates_token_count)
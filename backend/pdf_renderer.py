@@ -0,0 +1,133 @@
+"""
+ReportLab PDF renderer, imported by renderers.py only when a PDF is rendered
+"""
+import io
+from typing import Optional
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_RIGHT
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable, Table, TableStyle
+
+
+class PdfRenderer:
+    """ReportLab PDF renderer.
+
+    Colours, paragraph styles and the entry table style are built once per
+    instance (one per process) instead of on every render.
+    """
+
+    BLACK  = colors.HexColor('#1A1A1A')
+    DGRAY  = colors.HexColor('#2D2D2D')
+    MGRAY  = colors.HexColor('#555555')
+    ACCENT = colors.HexColor('#1E3A5F')
+
+    def __init__(self):
+        BLACK, DGRAY, MGRAY, ACCENT = self.BLACK, self.DGRAY, self.MGRAY, self.ACCENT
+        self.name_style = ParagraphStyle('PDFName', fontName='Helvetica-Bold', fontSize=22,
+                                         textColor=BLACK, alignment=TA_CENTER, spaceAfter=3, spaceBefore=0)
+        self.contact_style = ParagraphStyle('PDFContact', fontName='Helvetica', fontSize=8.5,
+                                            textColor=MGRAY, alignment=TA_CENTER, spaceAfter=8)
+        self.sec_style = ParagraphStyle('PDFSec', fontName='Helvetica-Bold', fontSize=10,
+                                        textColor=ACCENT, spaceBefore=10, spaceAfter=1)
+        self.entry_title_style = ParagraphStyle('PDFETitle', fontName='Helvetica-Bold', fontSize=9.5,
+                                                textColor=BLACK, spaceBefore=5, spaceAfter=0)
+        self.entry_sub_style   = ParagraphStyle('PDFESub', fontName='Helvetica-Oblique', fontSize=9,
+                                                textColor=MGRAY, spaceBefore=0, spaceAfter=2)
+        self.entry_date_style  = ParagraphStyle('PDFEDate', fontName='Helvetica', fontSize=9,
+                                                textColor=MGRAY, alignment=TA_RIGHT, spaceBefore=5, spaceAfter=0)
+        self.entry_date_sub    = ParagraphStyle('PDFEDateSub', fontName='Helvetica', fontSize=9,
+                                                textColor=MGRAY, alignment=TA_RIGHT, spaceBefore=0, spaceAfter=2)
+        self.bullet_style = ParagraphStyle('PDFBullet', fontName='Helvetica', fontSize=9.5,
+                                           textColor=DGRAY, leftIndent=14, spaceAfter=2, leading=13)
+        self.plain_style  = ParagraphStyle('PDFPlain', fontName='Helvetica', fontSize=9.5,
+                                           textColor=DGRAY, spaceAfter=3, leading=14)
+        self.entry_row_style = TableStyle([
+            ('VALIGN',        (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING',   (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING',  (0, 0), (-1, -1), 0),
+            ('TOPPADDING',    (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
+        ])
+
+    def section_block(self, title):
+        return [
+            Spacer(1, 4),
+            Paragraph(title.upper(), self.sec_style),
+            HRFlowable(width='100%', thickness=0.8, color=self.ACCENT, spaceAfter=3),
+        ]
+
+    def render_entry(self, entry):
+        items = []
+        for i, h in enumerate(entry['headers']):
+            st = self.entry_title_style if i == 0 else self.entry_sub_style
+            dt = self.entry_date_style  if i == 0 else self.entry_date_sub
+            if h['date']:
+                row = Table(
+                    [[Paragraph(h['title'], st), Paragraph(h['date'], dt)]],
+                    colWidths=['72%', '28%']
+                )
+                row.setStyle(self.entry_row_style)
+                items.append(row)
+            else:
+                items.append(Paragraph(h['text'], st))
+        for b in entry['bullets']:
+            items.append(Paragraph(f'\u2022 {b}', self.bullet_style))
+        return items
+
+    def render(self, layout: dict) -> bytes:
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer, pagesize=letter,
+            rightMargin=0.6*inch, leftMargin=0.6*inch,
+            topMargin=0.55*inch, bottomMargin=0.45*inch
+        )
+
+        story = []
+
+        # ── Header ──────────────────────────────────────────────────
+        story.append(Paragraph(layout['display_name'], self.name_style))
+
+        contact_parts = [p for p in [layout['email'], layout['phone']] if p]
+        if contact_parts:
+            story.append(Paragraph('  |  '.join(contact_parts), self.contact_style))
+
+        story.append(HRFlowable(width='100%', thickness=1.5, color=self.ACCENT, spaceAfter=6))
+
+        # ── Sections ────────────────────────────────────────────────
+        for section in layout['sections']:
+            story += self.section_block(section['name'])
+
+            if section['kind'] == 'skills':
+                # Render skills as clean inline text
+                story.append(Paragraph('  •  '.join(section['items']), self.plain_style))
+                continue
+
+            if not section['entries']:
+                story.append(Paragraph(section['content'], self.plain_style))
+                continue
+
+            for entry in section['entries']:
+                story += self.render_entry(entry)
+
+        doc.build(story)
+        result = buffer.getvalue()
+        buffer.close()
+        return result
+
+
+_pdf_renderer: Optional[PdfRenderer] = None
+
+
+def get_pdf_renderer() -> PdfRenderer:
+    """This process's PdfRenderer, created on first use."""
+    global _pdf_renderer
+    if _pdf_renderer is None:
+        _pdf_renderer = PdfRenderer()
+    return _pdf_renderer
+
+
+def generate_pdf(layout: dict) -> bytes:
+    return get_pdf_renderer().render(layout)
@@ -0,0 +1,204 @@
+"""
+Token-budgeted prompt construction and per-request LLM usage accounting
+"""
+import asyncio
+import heapq
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, NamedTuple, Optional
+
+from section_parser import SectionTokenizer
+
+logger = logging.getLogger(__name__)
+
+# Max prompt tokens of resume text per provider (system prompt excluded)
+PROMPT_TOKEN_BUDGETS = {
+    "openai": int(os.environ.get("OPENAI_PROMPT_TOKEN_BUDGET", "6000")),
+    "gemini": int(os.environ.get("GEMINI_PROMPT_TOKEN_BUDGET", "6000")),
+}
+INLINE_SPACE = re.compile(r'[ \t\u00a0\u2000-\u200b\u3000]+')
+
+# Longest a caller off the event loop waits for the tokenizer to load (the first
+# load may download it unless TIKTOKEN_CACHE_DIR holds a copy)
+TIKTOKEN_LOAD_TIMEOUT = float(os.environ.get("TIKTOKEN_LOAD_TIMEOUT_SECONDS", "5"))
+
+_encoding = None
+_encoding_loader: Optional[threading.Thread] = None
+_encoding_lock = threading.Lock()
+_encoding_slow = False
+_default_tokenizer = SectionTokenizer()
+
+
+def _load_encoding():
+    global _encoding
+    try:
+        import tiktoken
+        _encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken unavailable, estimating token counts: {e}")
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+        return True
+    except RuntimeError:
+        return False
+
+
+def _get_encoding():
+    """tiktoken's o200k_base (gpt-4o), or None while it is loading or if it cannot be loaded.
+
+    The encoding loads once, in a background thread. Callers on the event loop
+    never wait for it; others wait up to TIKTOKEN_LOAD_TIMEOUT, once. Until it
+    is ready, token counts are estimated.
+    """
+    global _encoding_loader, _encoding_slow
+    if _encoding is not None:
+        return _encoding
+    with _encoding_lock:
+        if _encoding_loader is None:
+            _encoding_loader = threading.Thread(target=_load_encoding, name="tiktoken-load", daemon=True)
+            _encoding_loader.start()
+    if not _encoding_slow and not _in_event_loop():
+        _encoding_loader.join(TIKTOKEN_LOAD_TIMEOUT)
+        if _encoding_loader.is_alive():
+            logger.warning(f"tiktoken still loading after {TIKTOKEN_LOAD_TIMEOUT}s, estimating token counts until it is ready")
+            _encoding_slow = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count with the gpt-4o tokenizer, or ~4 characters per token without it.
+
+    Gemini is counted the same way; the budgets are approximate by design.
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and blank-line runs in resume text before it is sent to a provider.
+
+    Page headers, footers and page numbers are already removed at extraction
+    (see extraction.strip_page_furniture); lines are never deduplicated here.
+    """
+    lines = [INLINE_SPACE.sub(' ', line).strip() for line in re.split(r'\r\n|[\r\n\f]', text)]
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(lines)).strip()
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """Cut ``text`` to at most ``budget`` tokens (``budget * 4`` characters without tiktoken)."""
+    encoding = _get_encoding()
+    if encoding is None:
+        return text[:max(0, budget) * 4]
+    tokens = encoding.encode(text, disallowed_special=())
+    keep = max(0, budget)
+    while len(tokens) > budget:
+        # Decoding a cut inside a multi-token character can re-encode longer, so shrink until it fits
+        text = encoding.decode(tokens[:keep])
+        tokens = encoding.encode(text, disallowed_special=())
+        keep -= 1
+    return text
+
+
+def trim_to_budget(text: str, budget: int, tokenizer: Optional[SectionTokenizer] = None) -> str:
+    """Drop trailing lines from the largest sections until ``text`` fits ``budget`` tokens.
+
+    Every section keeps its heading and its first lines, so the provider still
+    sees the whole resume structure rather than a document cut off mid-way.
+    Whatever is still over budget (a section that is one long line, text with
+    no line breaks) is then cut with truncate_tokens, so the result always fits.
+    """
+    if count_tokens(text) <= budget:
+        return text
+
+    tokenizer = tokenizer or _default_tokenizer
+    blocks = []
+    for name, heading, content in tokenizer.blocks(text):
+        lines = content.split('\n')
+        blocks.append((heading if name else None, lines, [count_tokens(line) + 1 for line in lines]))
+
+    sizes = [sum(costs) + (count_tokens(heading) + 2 if heading else 0) for heading, _, costs in blocks]
+    total = sum(sizes)
+    heap = [(-size, index) for index, size in enumerate(sizes)]
+    heapq.heapify(heap)
+    while total > budget and heap:
+        _, index = heapq.heappop(heap)
+        _, lines, costs = blocks[index]
+        if len(lines) <= 1:
+            continue
+        lines.pop()
+        removed = costs.pop()
+        sizes[index] -= removed
+        total -= removed
+        heapq.heappush(heap, (-sizes[index], index))
+
+    parts = []
+    for heading, lines, _ in blocks:
+        body = '\n'.join(lines).strip()
+        parts.append(f"{heading}\n{body}" if heading else body)
+    return truncate_tokens('\n\n'.join(part for part in parts if part), budget)
+
+
+class Prompt(NamedTuple):
+    text: str
+    tokens: int
+    original_tokens: int
+
+
+def build_prompt(text: str, provider: str, tokenizer: Optional[SectionTokenizer] = None) -> Prompt:
+    """Normalise ``text`` and fit it to the provider's token budget."""
+    original_tokens = count_tokens(text)
+    cleaned = trim_to_budget(normalize_text(text), PROMPT_TOKEN_BUDGETS[provider], tokenizer)
+    tokens = count_tokens(cleaned)
+    if tokens < original_tokens:
+        logger.info(f"{provider} prompt reduced from {original_tokens} to {tokens} tokens")
+    return Prompt(cleaned, tokens, original_tokens)
+
+
+# Usage records for the current request; tasks spawned by it share the same list
+_usage: ContextVar[Optional[List[Dict]]] = ContextVar("llm_usage", default=None)
+
+
+@contextmanager
+def track_usage():
+    """Collect every provider call made inside the block into the yielded list."""
+    records: List[Dict] = []
+    token = _usage.set(records)
+    try:
+        yield records
+    finally:
+        _usage.reset(token)
+
+
+def record_usage(provider: str, tokens_in: int, tokens_out: int, original_tokens_in: int):
+    records = _usage.get()
+    if records is not None:
+        records.append({
+            "provider": provider,
+            "tokens_in": tokens_in,
+            "tokens_out": tokens_out,
+            "original_tokens_in": original_tokens_in,
+        })
+
+
+def summarize_usage(records: List[Dict]) -> Dict:
+    """Totals and a per-provider breakdown for an API response."""
+    summary = {"calls": len(records), "tokens_in": 0, "tokens_out": 0, "original_tokens_in": 0, "providers": {}}
+    for record in records:
+        provider = summary["providers"].setdefault(record["provider"], {"calls": 0, "tokens_in": 0, "tokens_out": 0})
+        provider["calls"] += 1
+        for field in ("tokens_in", "tokens_out"):
+            provider[field] += record[field]
+            summary[field] += record[field]
+        summary["original_tokens_in"] += record["original_tokens_in"]
+    return summary
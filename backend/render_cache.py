@@ -0,0 +1,132 @@
+"""
+Size-capped on-disk LRU cache for rendered resume files
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RenderCache:
+    """Rendered PDF/DOCX/LaTeX bytes stored as files under ``directory``.
+
+    Keys are expected to contain the resume content hash, the format and the
+    renderer version, so an edited resume or a renderer change simply misses
+    and the stale file ages out. Reads bump the file's mtime and the oldest
+    files are deleted once the directory grows past ``max_bytes``; the index
+    is rebuilt from mtimes on start-up, so recency survives restarts and is
+    approximately shared by processes using the same directory. Disk errors
+    are logged and treated as misses.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._load()
+
+    def _load(self):
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            files = sorted(self.directory.glob("*.bin"), key=lambda p: p.stat().st_mtime)
+        except OSError as e:
+            logger.warning(f"Render cache directory unavailable: {e}")
+            return
+        for path in files:
+            try:
+                size = path.stat().st_size
+            except OSError:
+                continue
+            self._index[path.stem] = size
+            self._size += size
+
+    def _name(self, key: str) -> str:
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
+
+    def _get(self, key: str) -> Optional[bytes]:
+        name = self._name(key)
+        path = self.directory / f"{name}.bin"
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(name)
+                self.misses += 1
+            return None
+        except OSError as e:
+            logger.warning(f"Render cache read failed: {e}")
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            if name not in self._index:
+                # Written by another process sharing the directory
+                self._index[name] = len(data)
+                self._size += len(data)
+            self._index.move_to_end(name)
+            self.hits += 1
+        return data
+
+    def _set(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        name = self._name(key)
+        path = self.directory / f"{name}.bin"
+        tmp = self.directory / f"{name}.{uuid.uuid4().hex}.tmp"
+        try:
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Render cache write failed: {e}")
+            tmp.unlink(missing_ok=True)
+            return
+
+        with self._lock:
+            self._forget(name)
+            self._index[name] = len(data)
+            self._size += len(data)
+            victims = []
+            while self._size > self.max_bytes and len(self._index) > 1:
+                victim, size = self._index.popitem(last=False)
+                self._size -= size
+                self.evictions += 1
+                victims.append(victim)
+        for victim in victims:
+            (self.directory / f"{victim}.bin").unlink(missing_ok=True)
+
+    def _forget(self, name: str):
+        size = self._index.pop(name, None)
+        if size is not None:
+            self._size -= size
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, data: bytes):
+        await asyncio.to_thread(self._set, key, data)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,295 @@
+"""
+Resume renderers (PDF, DOCX, LaTeX) and the process pool they run in
+"""
+import io
+import os
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional
+
+from latex_template import TemplateFile
+from resume_layout import build_layout
+from worker_pool import WorkerPool
+
+# Bump when generate_pdf / generate_docx / generate_latex output changes so clients refetch
+RENDER_VERSION = 2
+
+# Compiled on first use in each process and recompiled when the file changes
+LATEX_TEMPLATE = TemplateFile(Path(__file__).parent / 'resume_template.tex')
+
+# Rendered in every format when a worker starts
+WARMUP_LAYOUT = build_layout({
+    "id": "warmup",
+    "full_name": "Warm Up",
+    "email": "warmup@example.com",
+    "sections": [
+        {"section_name": "Experience", "content": "Engineer | Example | Jan 2020 - Present\n- Shipped things"},
+        {"section_name": "Skills", "content": "Python"},
+    ],
+})
+
+# Pool configuration
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", min(4, os.cpu_count() or 1)))
+
+
+class RenderError(Exception):
+    """Raised when a resume cannot be rendered."""
+
+
+def generate_pdf(layout: dict) -> bytes:
+    # ReportLab is only imported by processes that render PDFs
+    from pdf_renderer import generate_pdf
+    return generate_pdf(layout)
+
+
+def generate_docx(layout: dict) -> bytes:
+    from docx import Document
+    from docx.shared import Pt, RGBColor, Inches
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.oxml.ns import qn
+    from docx.oxml import OxmlElement
+
+    doc = Document()
+
+    for sec in doc.sections:
+        sec.top_margin    = Inches(0.55)
+        sec.bottom_margin = Inches(0.45)
+        sec.left_margin   = Inches(0.6)
+        sec.right_margin  = Inches(0.6)
+
+    # Reuse the default empty first paragraph for the name (newer python-docx templates have none)
+    name_para = doc.paragraphs[0] if doc.paragraphs else doc.add_paragraph()
+
+    ACCENT = RGBColor(0x1E, 0x3A, 0x5F)
+    BLACK  = RGBColor(0x1A, 0x1A, 0x1A)
+    MGRAY  = RGBColor(0x55, 0x55, 0x55)
+
+    def sp(para, before=0, after=2):
+        para.paragraph_format.space_before = Pt(before)
+        para.paragraph_format.space_after  = Pt(after)
+
+    def add_hr(color='1E3A5F', sz='8'):
+        p = doc.add_paragraph()
+        sp(p, 0, 1)
+        pPr = p._p.get_or_add_pPr()
+        pBdr = OxmlElement('w:pBdr')
+        bottom = OxmlElement('w:bottom')
+        bottom.set(qn('w:val'), 'single')
+        bottom.set(qn('w:sz'), sz)
+        bottom.set(qn('w:space'), '1')
+        bottom.set(qn('w:color'), color)
+        pBdr.append(bottom)
+        pPr.append(pBdr)
+
+    def set_right_tab(para, pos_twips=10512):
+        """Right-aligned tab stop so name\tdate aligns to right margin."""
+        pPr = para._p.get_or_add_pPr()
+        tabs_el = OxmlElement('w:tabs')
+        tab_el  = OxmlElement('w:tab')
+        tab_el.set(qn('w:val'), 'right')
+        tab_el.set(qn('w:pos'), str(pos_twips))
+        tabs_el.append(tab_el)
+        pPr.append(tabs_el)
+
+    # ── Name ────────────────────────────────────────────────────
+    full_name = layout['display_name']
+    name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    sp(name_para, 0, 2)
+    nr = name_para.add_run(full_name)
+    nr.bold = True
+    nr.font.size = Pt(22)
+    nr.font.color.rgb = BLACK
+
+    # ── Contact ─────────────────────────────────────────────────
+    contact_parts = [p for p in [layout['email'], layout['phone']] if p]
+    if contact_parts:
+        cp = doc.add_paragraph(' | '.join(contact_parts))
+        cp.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        sp(cp, 0, 4)
+        for r in cp.runs:
+            r.font.size = Pt(9)
+            r.font.color.rgb = MGRAY
+
+    add_hr(color='1E3A5F', sz='12')
+
+    # ── Sections ────────────────────────────────────────────────
+    for section in layout['sections']:
+        sec_name = section['name']
+        content  = section['content']
+
+        sh = doc.add_paragraph()
+        sp(sh, 8, 1)
+        sr = sh.add_run(sec_name.upper())
+        sr.bold = True
+        sr.font.size = Pt(10)
+        sr.font.color.rgb = ACCENT
+        add_hr(color='1E3A5F', sz='8')
+
+        if section['kind'] == 'skills':
+            sp_para = doc.add_paragraph(' • '.join(section['items']))
+            sp(sp_para, 1, 3)
+            for r in sp_para.runs:
+                r.font.size = Pt(9.5)
+                r.font.color.rgb = BLACK
+            continue
+
+        if not section['entries']:
+            pp = doc.add_paragraph(content)
+            sp(pp, 1, 2)
+            for r in pp.runs:
+                r.font.size = Pt(9.5)
+            continue
+
+        for entry in section['entries']:
+            for i, h in enumerate(entry['headers']):
+                left, right = h['title'], h['date']
+                ep = doc.add_paragraph()
+                sp(ep, 4 if i == 0 else 0, 1)
+                if right:
+                    set_right_tab(ep)
+                    rl = ep.add_run(left)
+                    rl.bold   = (i == 0)
+                    rl.italic = (i > 0)
+                    rl.font.size      = Pt(9.5)
+                    rl.font.color.rgb = BLACK if i == 0 else MGRAY
+                    rd = ep.add_run('\t' + right)
+                    rd.font.size      = Pt(9)
+                    rd.font.color.rgb = MGRAY
+                else:
+                    rl = ep.add_run(h['text'])
+                    rl.bold   = (i == 0)
+                    rl.italic = (i > 0)
+                    rl.font.size      = Pt(9.5)
+                    rl.font.color.rgb = BLACK if i == 0 else MGRAY
+            for b in entry['bullets']:
+                bp = doc.add_paragraph(style='List Bullet')
+                sp(bp, 0, 1)
+                br = bp.add_run(b)
+                br.font.size      = Pt(9.5)
+                br.font.color.rgb = BLACK
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def escape_latex(text: str) -> str:
+    """Escape special LaTeX characters in plain text."""
+    if not text:
+        return ""
+    for char, rep in [
+        ('&', r'\&'), ('%', r'\%'), ('$', r'\$'),
+        ('#', r'\#'), ('_', r'\_'),
+    ]:
+        text = text.replace(char, rep)
+    return text
+
+
+def latex_entries(section: Optional[dict], **defaults) -> list:
+    """Template items for a section's entries; never empty, since LaTeX rejects an empty list."""
+    items = []
+    for entry in (section or {}).get('entries', []):
+        headers = entry['headers']
+        items.append({
+            **defaults,
+            'title':  escape_latex(headers[0]['title']) if headers else '',
+            'detail': escape_latex(headers[0]['date']) if headers else '',
+            'extra':  escape_latex(headers[1]['text']) if len(headers) > 1 else '',
+            'points': [escape_latex(b) for b in entry['bullets']] or [''],
+        })
+    return items or [{**defaults, 'title': '', 'detail': '', 'extra': '', 'points': ['']}]
+
+
+def generate_latex(layout: dict) -> str:
+    """Fill the ATS LaTeX template with resume data."""
+    sections = {s['key']: s for s in layout['sections']}
+
+    def lines_of(key, n):
+        ls = sections[key]['lines'] if key in sections else []
+        return ls[:n] + [''] * max(0, n - len(ls))
+
+    def content_of(key):
+        return sections[key]['content'] if key in sections else ''
+
+    edu_lines = lines_of('education', 3)
+    achievements = sections.get('awards') or sections.get('achievements')
+
+    vals = {
+        'name':               escape_latex(layout['full_name']),
+        'job_title':          '',
+        'location_link':      'https://maps.google.com',
+        'location':           '',
+        'phone':              layout['phone'],
+        'email':              layout['email'],
+        'linkedin_url':       'https://linkedin.com',
+        'github_url':         'https://github.com',
+        'kaggle_url':         'https://kaggle.com',
+        'portfolio_url':      'https://example.com',
+        'degree':             escape_latex(edu_lines[0]),
+        'graduation_year':    '',
+        'university':         escape_latex(edu_lines[1]),
+        'cgpa':               '',
+        'professional_summary': escape_latex(content_of('summary')),
+        'languages':          escape_latex(content_of('skills')),
+        'ml_skills':          '',
+        'genai_skills':       '',
+        'ml_libraries':       '',
+        'databases':          '',
+        'developer_tools':    '',
+        'experience': [
+            {**item, 'company': item['title'], 'duration': item['detail'], 'location': item['extra']}
+            for item in latex_entries(sections.get('experience'))
+        ],
+        'projects': [
+            {**item, 'name': item['title'], 'tech': item['detail']}
+            for item in latex_entries(sections.get('projects'), demo='https://example.com', github='https://github.com')
+        ],
+        'certifications':     escape_latex(content_of('certifications')),
+        'achievements':       [escape_latex(line) for line in achievements['lines']] if achievements else [''],
+        'spoken_languages':   'English',
+        'interests':          '',
+    }
+
+    return LATEX_TEMPLATE.render(vals)
+
+
+def renderer_version(format: str) -> str:
+    """RENDER_VERSION, plus a digest of resume_template.tex for LaTeX (and bundles) so template edits invalidate."""
+    if format in ("pdf", "docx"):
+        return f"r{RENDER_VERSION}"
+    return f"r{RENDER_VERSION}-t{LATEX_TEMPLATE.digest}"
+
+
+def render_resume(layout: dict, format: str) -> bytes:
+    """Render a resume_layout layout to 'pdf', 'docx' or 'latex' bytes; runs inside a RenderPool worker."""
+    if format == "pdf":
+        return generate_pdf(layout)
+    elif format == "docx":
+        return generate_docx(layout)
+    return generate_latex(layout).encode('utf-8')
+
+
+def init_render_worker():
+    """Build the per-process renderer state up front instead of on a worker's first render.
+
+    Rendering WARMUP_LAYOUT in every format also runs generate_docx's local
+    imports and loads python-docx's default template.
+    """
+    for format in ("pdf", "docx", "latex"):
+        render_resume(WARMUP_LAYOUT, format)
+
+
+class RenderPool(WorkerPool):
+    """Each worker builds its PdfRenderer, compiles the LaTeX template and
+    renders a tiny resume once when it starts, so renders only pay for the
+    document itself."""
+
+    def __init__(self, workers: int = RENDER_WORKERS):
+        super().__init__("Render", workers, init_render_worker)
+
+    async def render(self, layout: dict, format: str) -> bytes:
+        try:
+            return await self.run(render_resume, layout, format)
+        except BrokenProcessPool:
+            raise RenderError(f"Failed to render {format.upper()}")
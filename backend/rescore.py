@@ -0,0 +1,157 @@
+"""
+Bulk ATS Re-score Job
+Recomputes the ATS score embedded in every stored resume and enhanced resume
+after a change to calculate_ats_score, and embeds one in older documents whose
+score is only in the legacy ats_scores collection. Documents are streamed in
+_id order, scored in a process pool and written back with unordered bulk
+writes. Progress is checkpointed per collection so an interrupted run resumes
+where it stopped.
+
+Usage: python rescore.py [--batch-size 1000] [--workers 4] [--reset]
+"""
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+
+# Load environment variables
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from server import ANALYSIS_VERSION, ResumeSection, calculate_ats_score  # noqa: E402
+
+# collection -> (text field, sections field)
+SOURCES = {
+    "resumes": ("raw_text", "sections"),
+    "enhanced_resumes": ("enhanced_text", "enhanced_sections"),
+}
+
+
+def score_batch(items):
+    """Score ``[(resume_id, user_id, text, sections)]`` in a worker process."""
+    results = []
+    for resume_id, user_id, text, sections in items:
+        score = calculate_ats_score(text, [ResumeSection(**s) for s in sections])
+        results.append((resume_id, user_id, score.model_dump(exclude={"id", "resume_id", "created_at"})))
+    return results
+
+
+async def write_scores(collection, results):
+    """Store each score on its resume document, creating ats_score on documents that predate it."""
+    now = datetime.now(timezone.utc).isoformat()
+    ops = [
+        UpdateOne(
+            {"id": resume_id},
+            [{"$set": {"ats_score": {"$mergeObjects": [
+                {"id": str(uuid.uuid4()), "created_at": now},
+                "$ats_score",
+                # $literal so score strings starting with "$" are not read as field paths
+                {"$literal": {**fields, "resume_id": resume_id, "user_id": user_id, "rescored_at": now}},
+            ]}}}]
+        )
+        for resume_id, user_id, fields in results
+    ]
+    if ops:
+        await collection.bulk_write(ops, ordered=False)
+
+
+async def rescore_collection(db, executor, name, batch_size, workers, reset):
+    text_field, sections_field = SOURCES[name]
+    checkpoints = db.rescore_checkpoints
+
+    checkpoint = None if reset else await checkpoints.find_one({"_id": name})
+    if checkpoint and checkpoint.get("analysis_version") != ANALYSIS_VERSION:
+        print(f"   Scoring changed since last checkpoint, starting {name} from the beginning")
+        checkpoint = None
+
+    query = {"_id": {"$gt": checkpoint["last_id"]}} if checkpoint else {}
+    processed = checkpoint.get("processed", 0) if checkpoint else 0
+    if checkpoint:
+        print(f"   Resuming {name} after {processed} documents")
+
+    projection = {"_id": 1, "id": 1, "user_id": 1, text_field: 1, sections_field: 1}
+    cursor = db[name].find(query, projection).sort("_id", 1).batch_size(batch_size)
+
+    loop = asyncio.get_running_loop()
+    pending = []
+    started = time.perf_counter()
+    count = 0
+
+    async def finish_oldest():
+        # Batches are awaited in the order they were read, so the checkpoint
+        # only ever advances past documents whose scores are written
+        nonlocal processed, count
+        last_id, size, future = pending.pop(0)
+        await write_scores(db[name], await future)
+        processed += size
+        count += size
+        await checkpoints.replace_one(
+            {"_id": name},
+            {"last_id": last_id, "processed": processed, "analysis_version": ANALYSIS_VERSION,
+             "updated_at": datetime.now(timezone.utc)},
+            upsert=True
+        )
+        elapsed = time.perf_counter() - started
+        print(f"   {name}: {processed} documents ({count / elapsed:,.0f} docs/sec)", end="\r")
+
+    batch, last_id = [], None
+    async for doc in cursor:
+        batch.append((doc.get("id"), doc.get("user_id"), doc.get(text_field) or "", doc.get(sections_field) or []))
+        last_id = doc["_id"]
+        if len(batch) >= batch_size:
+            pending.append((last_id, len(batch), loop.run_in_executor(executor, score_batch, batch)))
+            batch = []
+            if len(pending) >= workers * 2:
+                await finish_oldest()
+    if batch:
+        pending.append((last_id, len(batch), loop.run_in_executor(executor, score_batch, batch)))
+    while pending:
+        await finish_oldest()
+
+    return count, time.perf_counter() - started
+
+
+async def rescore_all(batch_size, workers, reset):
+    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
+    db_name = os.environ.get('DB_NAME', 'resume_builder')
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[db_name]
+
+    print("=" * 60)
+    print(f"Re-scoring ATS scores in '{db_name}' (analysis version {ANALYSIS_VERSION})")
+    print(f"Batch size: {batch_size}, workers: {workers}")
+    print("=" * 60)
+
+    total, total_elapsed = 0, 0.0
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for name in SOURCES:
+                count, elapsed = await rescore_collection(db, executor, name, batch_size, workers, reset)
+                rate = count / elapsed if elapsed else 0
+                print(f"\n✅ {name}: {count} documents in {elapsed:.1f}s ({rate:,.0f} docs/sec)")
+                total += count
+                total_elapsed += elapsed
+    finally:
+        client.close()
+
+    print("=" * 60)
+    rate = total / total_elapsed if total_elapsed else 0
+    print(f"Done: {total} documents in {total_elapsed:.1f}s ({rate:,.0f} docs/sec)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute stored ATS scores")
+    parser.add_argument("--batch-size", type=int, default=1000, help="documents per cursor batch and bulk write")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="scoring processes")
+    parser.add_argument("--reset", action="store_true", help="ignore checkpoints and start from the beginning")
+    args = parser.parse_args()
+    asyncio.run(rescore_all(args.batch_size, args.workers, args.reset))
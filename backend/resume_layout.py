@@ -0,0 +1,108 @@
+"""
+Format-independent resume layout shared by the PDF, DOCX and LaTeX renderers
+"""
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Tuple
+
+# Bump when build_layout output changes so persisted layouts are rebuilt
+LAYOUT_VERSION = 1
+
+# Fields of a resume document the layout is built from
+LAYOUT_SOURCE_FIELDS = ("id", "full_name", "email", "phone", "sections")
+
+DATE_RE = re.compile(
+    r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*[\s,.]+\d{4}'
+    r'|\bpresent\b|\d{4}\s*[-\u2013]\s*(?:\d{4}|present)',
+    re.IGNORECASE
+)
+BULLET_CHARS = '-\u2022*\u00b7\u2013'
+
+
+def parse_entries(content: str) -> List[Tuple[List[str], List[str]]]:
+    """Group section lines into ``(header lines, bullet lines)`` entries."""
+    entries = []
+    cur_h, cur_b = [], []
+    for raw in content.split('\n'):
+        s = raw.strip()
+        if not s:
+            continue
+        if s[0] in BULLET_CHARS:
+            cur_b.append(s.lstrip(BULLET_CHARS + ' ').strip())
+        else:
+            if cur_b:
+                entries.append((cur_h, cur_b))
+                cur_h, cur_b = [s], []
+            else:
+                cur_h.append(s)
+    if cur_h or cur_b:
+        entries.append((cur_h, cur_b))
+    return entries
+
+
+def split_date(line: str) -> Tuple[str, str]:
+    """Split an entry header into its title and its date (or ``|``-separated details)."""
+    m = DATE_RE.search(line)
+    if m:
+        date_str = line[m.start():].strip()
+        left = line[:m.start()].strip().rstrip('|,\u2013- ').strip()
+        return left, date_str
+    if '|' in line:
+        parts = [p.strip() for p in line.split('|')]
+        return parts[0], ' | '.join(parts[1:])
+    return line, ''
+
+
+def layout_source_hash(resume_data: dict) -> str:
+    source = {field: resume_data.get(field) for field in LAYOUT_SOURCE_FIELDS}
+    return hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def build_layout(resume_data: dict) -> Dict[str, Any]:
+    """Parse a resume document once into the structure every renderer draws from.
+
+    Sections keep their raw ``content`` and non-empty ``lines``; skills
+    sections get ``items`` and all others get ``entries`` of
+    ``{"headers": [{"text", "title", "date"}], "bullets": [...]}``. The result
+    is plain JSON so it can be stored on the resume document.
+    """
+    sections = []
+    for section in resume_data.get('sections', []):
+        name = section['section_name']
+        content = section.get('content', '')
+        lines = [line.strip() for line in content.split('\n') if line.strip()]
+        block = {"name": name, "key": name.lower(), "content": content, "lines": lines}
+        if 'skill' in block["key"]:
+            block["kind"] = "skills"
+            block["items"] = lines
+        else:
+            block["kind"] = "entries"
+            block["entries"] = [
+                {
+                    "headers": [dict(zip(("title", "date"), split_date(h)), text=h) for h in headers],
+                    "bullets": bullets,
+                }
+                for headers, bullets in parse_entries(content)
+            ]
+        sections.append(block)
+
+    return {
+        "version": LAYOUT_VERSION,
+        "source_hash": layout_source_hash(resume_data),
+        "full_name": resume_data.get('full_name', ''),
+        # Heading for PDF/DOCX, which fall back to the id when there is no name
+        "display_name": resume_data.get('full_name', resume_data.get('id', 'Resume')),
+        "email": resume_data.get('email', ''),
+        "phone": resume_data.get('phone', ''),
+        "sections": sections,
+    }
+
+
+def layout_is_current(resume_data: dict) -> bool:
+    layout = resume_data.get('layout')
+    return (
+        isinstance(layout, dict)
+        and layout.get('version') == LAYOUT_VERSION
+        and layout.get('source_hash') == layout_source_hash(resume_data)
+    )
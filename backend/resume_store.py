@@ -0,0 +1,66 @@
+"""
+Data access for resumes and enhanced resumes, one MongoDB round trip per call
+"""
+from typing import Any, Dict, Optional, Tuple
+
+
+class ResumeStore:
+    """Resume and enhanced resume documents with their ATS score embedded.
+
+    The score is stored on the resume as ``ats_score`` rather than as a
+    separate ats_scores document, so creating a resume is a single insert
+    and reading it back a single query. Resumes saved before that keep
+    their score in ats_scores; ``get_with_score`` picks it up with a
+    ``$lookup`` in the same aggregation, and rescore.py embeds a fresh score
+    in every document.
+    """
+
+    def __init__(self, db):
+        self.db = db
+
+    async def insert(self, collection: str, doc: Dict[str, Any], score: Dict[str, Any]):
+        await self.db[collection].insert_one({**doc, "ats_score": score})
+
+    async def get(self, resume_id: str, projection: Optional[Dict[str, Any]] = None,
+                  **match) -> Optional[Dict[str, Any]]:
+        return await self.db.resumes.find_one({"id": resume_id, **match}, projection)
+
+    async def get_with_score(self, resume_id: str,
+                             exclude=("tfidf", "layout")) -> Optional[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """``(resume, ats_score)`` for a resume, or None; ``exclude`` lists fields left out of the resume."""
+        pipeline = [
+            {"$match": {"id": resume_id}},
+            {"$limit": 1},
+            {"$lookup": {"from": "ats_scores", "localField": "id", "foreignField": "resume_id",
+                         "as": "legacy_scores"}},
+            {"$project": {"_id": 0, "legacy_scores._id": 0, **{field: 0 for field in exclude}}},
+        ]
+        docs = await self.db.resumes.aggregate(pipeline).to_list(1)
+        if not docs:
+            return None
+        resume = docs[0]
+        legacy = resume.pop("legacy_scores", None) or [None]
+        return resume, resume.pop("ats_score", None) or legacy[0]
+
+    async def find_any(self, resume_id: str, projection: Optional[Dict[str, Any]] = None) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """A resume, or failing that an enhanced resume, by id in one query.
+
+        Returns the document and the collection it came from (for follow-up
+        updates), or ``(None, None)``. ``projection`` may only exclude fields.
+        """
+        pipeline = [
+            {"$match": {"id": resume_id}},
+            {"$set": {"_collection": "resumes"}},
+            {"$unionWith": {"coll": "enhanced_resumes", "pipeline": [
+                {"$match": {"id": resume_id}},
+                {"$set": {"_collection": "enhanced_resumes"}},
+            ]}},
+            {"$limit": 1},
+        ]
+        if projection:
+            pipeline.append({"$project": projection})
+        docs = await self.db.resumes.aggregate(pipeline).to_list(1)
+        if not docs:
+            return None, None
+        resume = docs[0]
+        return resume, self.db[resume.pop("_collection")]
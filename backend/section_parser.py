@@ -0,0 +1,105 @@
+"""
+Single-pass, line-oriented resume section tokenizer
+"""
+import json
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Canonical section name -> heading aliases. Order is the order sections are returned in.
+DEFAULT_HEADINGS: Dict[str, List[str]] = {
+    "Summary": ["summary", "professional summary", "career summary", "objective",
+                "career objective", "profile", "professional profile", "about me"],
+    "Experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships"],
+    "Education": ["education", "academic background", "education and training"],
+    "Skills": ["skills", "technical skills", "key skills", "core skills", "competencies",
+               "core competencies", "skills and competencies"],
+    "Projects": ["projects", "personal projects", "academic projects", "key projects"],
+    "Certifications": ["certifications", "certificates", "licenses and certifications",
+                       "licenses & certifications", "certifications and licenses"],
+    "Awards": ["awards", "honors", "honors and awards", "honors & awards", "achievements",
+               "achievements & recognition", "achievements and recognition"],
+    "Publications": ["publications"],
+    "Volunteering": ["volunteering", "volunteer experience", "volunteer work"],
+}
+
+# Headings are short; longer lines are never looked up
+MAX_HEADING_LENGTH = 48
+
+# Markdown and decoration that LLM output tends to wrap headings in
+_HEADING_DECORATION = "#*_=~`|[]() \t"
+
+
+def load_headings(path: str) -> Dict[str, List[str]]:
+    """Load a heading dictionary from a JSON file of ``{"Section": ["alias", ...]}``."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _normalize_heading(candidate: str) -> str:
+    candidate = candidate.strip(_HEADING_DECORATION).rstrip(':').strip(_HEADING_DECORATION)
+    return " ".join(candidate.lower().split())
+
+
+class SectionTokenizer:
+    """Split resume text into sections in one pass over its lines.
+
+    A line is a heading when, ignoring case, surrounding markdown and a
+    trailing colon, it equals one of the configured aliases. ``Heading: text``
+    lines are headings with inline content. Each line costs one dictionary
+    lookup, so parsing is linear in the size of the text.
+    """
+
+    def __init__(self, headings: Optional[Dict[str, List[str]]] = None):
+        self.headings = headings or DEFAULT_HEADINGS
+        self._order = {name: i for i, name in enumerate(self.headings)}
+        self._aliases = {}
+        for name, aliases in self.headings.items():
+            for alias in [name, *aliases]:
+                self._aliases.setdefault(_normalize_heading(alias), name)
+
+    def match_heading(self, line: str) -> Optional[Tuple[str, str]]:
+        """Return ``(section_name, inline_content)`` if ``line`` is a heading."""
+        head, _, rest = line.partition(':')
+        if len(head) > MAX_HEADING_LENGTH:
+            return None
+        name = self._aliases.get(_normalize_heading(head))
+        if name is None:
+            return None
+        return name, rest.strip()
+
+    def blocks(self, text: str) -> Iterator[Tuple[Optional[str], str, str]]:
+        """Yield ``(section_name, heading_line, content)`` in document order.
+
+        Text before the first heading is yielded with ``section_name`` None.
+        """
+        name, heading, lines = None, "", []
+        for line in text.split('\n'):
+            matched = self.match_heading(line)
+            if matched is None:
+                lines.append(line)
+                continue
+            if name is not None or any(l.strip() for l in lines):
+                yield name, heading, "\n".join(lines).strip()
+            name, heading = matched[0], line
+            lines = [matched[1]] if matched[1] else []
+        if name is not None or any(l.strip() for l in lines):
+            yield name, heading, "\n".join(lines).strip()
+
+    def parse(self, text: str) -> List[Tuple[str, str]]:
+        """Return ``[(section_name, content)]`` in heading-dictionary order.
+
+        Repeated headings (e.g. "Experience" continued on a second page) are
+        merged. Falls back to a single "Content" section when nothing matches.
+        """
+        found: Dict[str, List[str]] = {}
+        for name, _, content in self.blocks(text):
+            if name is None:
+                continue
+            parts = found.setdefault(name, [])
+            if content:
+                parts.append(content)
+
+        if not found:
+            return [("Content", text)]
+        ordered = sorted(found, key=self._order.__getitem__)
+        return [(name, "\n".join(found[name])) for name in ordered]
@@ -1,27 +1,40 @@
-from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi import FastAPI, APIRouter, UploadFile, File, HTTPException, Depends, Header
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from fastapi.responses import Response, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timezone
-from PyPDF2 import PdfReader
-from docx import Document
+import time
+import importlib
+import tempfile
+import zipfile
 import io
+import json
+from datetime import datetime, timezone
 import re
 
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, HRFlowable, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
 import llm_helper as llm_ops
+from cache import TieredCache
+from keyword_matcher import KeywordMatcher, DEFAULT_KEYWORDS, load_keywords
+from section_parser import SectionTokenizer, load_headings
+from singleflight import SingleFlight, MongoSingleFlight
+from jobs import JobQueue, JobWorker
+from db_indexes import collect_indexes, ensure_indexes, explain_hot_queries
+from render_cache import RenderCache
+from renderers import RenderPool, renderer_version
+from resume_layout import build_layout, layout_is_current
+from resume_store import ResumeStore
+from llm_gateway import LLMError, ProviderUnavailable
+from prompt_builder import count_tokens, summarize_usage, track_usage
+from extraction import ExtractionPool, ExtractionError, ExtractionQueueFull, UploadTooLarge, spooled_upload
 from auth import create_access_token, decode_token, verify_password, get_password_hash, Token
 
 ROOT_DIR = Path(__file__).parent
@@ -31,7 +44,15 @@ mongo_url = os.environ['MONGO_URL']
 client = AsyncIOMotorClient(mongo_url)
 db = client[os.environ['DB_NAME']]
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await startup()
+    try:
+        yield
+    finally:
+        await shutdown()
+
+app = FastAPI(lifespan=lifespan)
 api_router = APIRouter(prefix="/api")
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -100,63 +121,71 @@ class ManualResumeInput(BaseModel):
 class EnhanceRequest(BaseModel):
     resume_id: str
     enhancement_type: str = "both"
+    regenerate: bool = False  # bypass cached LLM responses
+
+class JobMatchRequest(BaseModel):
+    job_description: str
 
 class GoogleAuthRequest(BaseModel):
     credential: str  # Google ID token
 
 # Helper Functions
-def extract_text_from_pdf(file_content: bytes) -> str:
-    try:
-        pdf_file = io.BytesIO(file_content)
-        reader = PdfReader(pdf_file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting PDF: {e}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from PDF")
-
-def extract_text_from_docx(file_content: bytes) -> str:
-    try:
-        docx_file = io.BytesIO(file_content)
-        doc = Document(docx_file)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
-    except Exception as e:
-        logger.error(f"Error extracting DOCX: {e}")
-        raise HTTPException(status_code=400, detail="Failed to extract text from DOCX")
+extraction_pool = ExtractionPool()
+upload_cache = TieredCache(
+    "upload",
+    db.upload_cache,
+    max_entries=int(os.environ.get("UPLOAD_CACHE_MAX_ENTRIES", "256")),
+    db_ttl_seconds=int(os.environ.get("UPLOAD_CACHE_TTL_DAYS", "30")) * 86400
+)
+keyword_matcher = KeywordMatcher(
+    load_keywords(os.environ["ATS_KEYWORDS_FILE"]) if os.environ.get("ATS_KEYWORDS_FILE") else DEFAULT_KEYWORDS
+)
+# Keyword matches that earn a full keyword score, capped at the taxonomy size
+ATS_KEYWORD_TARGET = min(
+    max(1, int(os.environ.get("ATS_KEYWORD_TARGET", str(len(DEFAULT_KEYWORDS))))), len(keyword_matcher)
+)
+llm_cache = TieredCache(
+    "llm",
+    db.llm_cache,
+    max_entries=int(os.environ.get("LLM_CACHE_MAX_ENTRIES", "512")),
+    memory_ttl_seconds=int(os.environ.get("LLM_CACHE_MEMORY_TTL_MINUTES", "60")) * 60,
+    db_ttl_seconds=int(os.environ.get("LLM_CACHE_TTL_DAYS", "7")) * 86400
+)
+render_cache = RenderCache(
+    os.environ.get("RENDER_CACHE_DIR", os.path.join(tempfile.gettempdir(), "resume-render-cache")),
+    max_bytes=int(os.environ.get("RENDER_CACHE_MAX_MB", "512")) * 1024 * 1024
+)
+render_pool = RenderPool()
+enhancement_flights = SingleFlight()
+enhancement_locks = MongoSingleFlight(
+    db.enhancement_locks,
+    lease_seconds=int(os.environ.get("ENHANCE_LOCK_SECONDS", "180"))
+)
+job_queue = JobQueue(db.jobs)
+resume_store = ResumeStore(db)
+# Start-up warm-up, reported by /api/ready
+MONGO_WARM_CONNECTIONS = int(os.environ.get("MONGO_WARM_CONNECTIONS", "4"))
+WARMUP_RETRY_SECONDS = int(os.environ.get("WARMUP_RETRY_SECONDS", "5"))
+readiness: Dict[str, Any] = {"ready": False, "warmup_seconds": None, "steps": {}, "missing_indexes": []}
+warmup_tasks = set()
+# Objects whose collections need indexes besides those in db_indexes.APP_INDEXES
+INDEX_OWNERS = (upload_cache, llm_cache, enhancement_locks, job_queue)
+# Enhancement jobs executed inside each API process; set to 0 when running enhance_worker.py separately
+ENHANCE_JOB_CONCURRENCY = int(os.environ.get("ENHANCE_JOB_CONCURRENCY", "2"))
+section_tokenizer = SectionTokenizer(
+    load_headings(os.environ["SECTION_HEADINGS_FILE"]) if os.environ.get("SECTION_HEADINGS_FILE") else None
+)
 
 def parse_resume_sections(text: str) -> List[ResumeSection]:
-    sections = []
-    section_patterns = [
-        (r"(SUMMARY|PROFESSIONAL SUMMARY|OBJECTIVE)\s*:?\s*([\s\S]*?)(?=\n\n|EXPERIENCE|EDUCATION|SKILLS|$)", "Summary"),
-        (r"(EXPERIENCE|WORK EXPERIENCE|EMPLOYMENT)\s*:?\s*([\s\S]*?)(?=\n\n|EDUCATION|SKILLS|$)", "Experience"),
-        (r"(EDUCATION|ACADEMIC BACKGROUND)\s*:?\s*([\s\S]*?)(?=\n\n|EXPERIENCE|SKILLS|$)", "Education"),
-        (r"(SKILLS|TECHNICAL SKILLS|COMPETENCIES)\s*:?\s*([\s\S]*?)(?=\n\n|EXPERIENCE|EDUCATION|$)", "Skills"),
+    return [
+        ResumeSection(section_name=name, content=content)
+        for name, content in section_tokenizer.parse(text)
     ]
-    
-    for pattern, section_name in section_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            sections.append(ResumeSection(section_name=section_name, content=match.group(2).strip()))
-    
-    if not sections:
-        sections.append(ResumeSection(section_name="Content", content=text))
-    
-    return sections
 
 def calculate_ats_score(text: str, sections: List[ResumeSection]) -> ATSScore:
-    keyword_list = [
-        "python", "javascript", "react", "node", "fastapi", "mongodb", "sql",
-        "aws", "docker", "kubernetes", "git", "agile", "scrum", "ci/cd",
-        "leadership", "communication", "teamwork", "problem-solving",
-        "bachelor", "master", "degree", "certified", "manager", "engineer"
-    ]
-    
-    text_lower = text.lower()
-    keyword_matches = sum(1 for kw in keyword_list if kw in text_lower)
-    keyword_score = min(100, int((keyword_matches / len(keyword_list)) * 100))
+    keyword_hits = keyword_matcher.find_all(text)
+    keyword_matches = len(keyword_hits)
+    keyword_score = min(100, int((keyword_matches / ATS_KEYWORD_TARGET) * 100))
     
     section_names = [s.section_name.lower() for s in sections]
     required_sections = ["experience", "education", "skills"]
@@ -178,421 +207,260 @@ def calculate_ats_score(text: str, sections: List[ResumeSection]) -> ATSScore:
         section_score=section_score,
         details={
             "keyword_matches": keyword_matches,
-            "total_keywords": len(keyword_list),
+            "total_keywords": len(keyword_matcher),
+            "target_keywords": ATS_KEYWORD_TARGET,
+            "matched_keywords": sorted(keyword_hits),
             "has_email": has_email,
             "has_phone": has_phone,
             "sections_found": [s.section_name for s in sections]
         }
     )
 
-async def enhance_with_openai(text: str) -> str:
-    return await llm_ops.enhance_with_openai(text)
+# Bump when text extraction, parse_resume_sections or calculate_ats_score change so cached analyses are recomputed
+ANALYSIS_VERSION = 4
 
-async def enhance_with_gemini(text: str) -> str:
-    return await llm_ops.enhance_with_gemini(text)
+async def analyze_upload(file: UploadFile):
+    """Extract, parse and score an uploaded resume.
 
-def generate_pdf(resume_data: dict) -> bytes:
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer, pagesize=letter,
-        rightMargin=0.6*inch, leftMargin=0.6*inch,
-        topMargin=0.55*inch, bottomMargin=0.45*inch
-    )
+    Results are cached by the SHA-256 of the file, so re-uploading identical
+    bytes costs one hash and one cache lookup.
+    """
+    if file.filename.endswith('.pdf'):
+        kind = "pdf"
+    elif file.filename.endswith('.docx'):
+        kind = "docx"
+    else:
+        raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
 
-    BLACK  = colors.HexColor('#1A1A1A')
-    DGRAY  = colors.HexColor('#2D2D2D')
-    MGRAY  = colors.HexColor('#555555')
-    ACCENT = colors.HexColor('#1E3A5F')
-
-    name_style = ParagraphStyle('PDFName', fontName='Helvetica-Bold', fontSize=22,
-                                 textColor=BLACK, alignment=TA_CENTER, spaceAfter=3, spaceBefore=0)
-    contact_style = ParagraphStyle('PDFContact', fontName='Helvetica', fontSize=8.5,
-                                    textColor=MGRAY, alignment=TA_CENTER, spaceAfter=8)
-    sec_style = ParagraphStyle('PDFSec', fontName='Helvetica-Bold', fontSize=10,
-                                textColor=ACCENT, spaceBefore=10, spaceAfter=1)
-    entry_title_style = ParagraphStyle('PDFETitle', fontName='Helvetica-Bold', fontSize=9.5,
-                                        textColor=BLACK, spaceBefore=5, spaceAfter=0)
-    entry_sub_style   = ParagraphStyle('PDFESub', fontName='Helvetica-Oblique', fontSize=9,
-                                        textColor=MGRAY, spaceBefore=0, spaceAfter=2)
-    entry_date_style  = ParagraphStyle('PDFEDate', fontName='Helvetica', fontSize=9,
-                                        textColor=MGRAY, alignment=TA_RIGHT, spaceBefore=5, spaceAfter=0)
-    entry_date_sub    = ParagraphStyle('PDFEDateSub', fontName='Helvetica', fontSize=9,
-                                        textColor=MGRAY, alignment=TA_RIGHT, spaceBefore=0, spaceAfter=2)
-    bullet_style = ParagraphStyle('PDFBullet', fontName='Helvetica', fontSize=9.5,
-                                   textColor=DGRAY, leftIndent=14, spaceAfter=2, leading=13)
-    plain_style  = ParagraphStyle('PDFPlain', fontName='Helvetica', fontSize=9.5,
-                                   textColor=DGRAY, spaceAfter=3, leading=14)
-
-    DATE_RE = re.compile(
-        r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*[\s,.]+\d{4}'
-        r'|\bpresent\b|\d{4}\s*[-\u2013]\s*(?:\d{4}|present)',
-        re.IGNORECASE
+    try:
+        async with spooled_upload(file) as upload:
+            cache_key = f"v{ANALYSIS_VERSION}:{upload.sha256}"
+            cached = await upload_cache.get(cache_key)
+            if cached is not None:
+                sections = [ResumeSection(**s) for s in cached["sections"]]
+                return cached["text"], sections, ATSScore(resume_id="", **cached["ats_score"])
+            text = await extraction_pool.extract(kind, upload.path)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExtractionQueueFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Resume extraction is busy, please retry shortly",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except ExtractionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    sections = parse_resume_sections(text)
+    ats_score = calculate_ats_score(text, sections)
+    await upload_cache.set(cache_key, {
+        "text": text,
+        "sections": [s.model_dump() for s in sections],
+        "ats_score": ats_score.model_dump(exclude={"id", "resume_id", "created_at"})
+    })
+    return text, sections, ats_score
+
+async def _cached_enhancement(provider: str, enhance, text: str, regenerate: bool) -> str:
+    key = llm_ops.cache_key(provider, text)
+    if not regenerate:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            return cached
+
+    enhanced = await enhance(text)
+    # Without an API key llm_helper echoes the input back; never cache that
+    if enhanced != text:
+        await llm_cache.set(key, enhanced)
+    return enhanced
+
+async def enhance_with_openai(text: str, regenerate: bool = False) -> str:
+    return await _cached_enhancement("openai", llm_ops.enhance_with_openai, text, regenerate)
+
+async def enhance_with_gemini(text: str, regenerate: bool = False) -> str:
+    return await _cached_enhancement("gemini", llm_ops.enhance_with_gemini, text, regenerate)
+
+async def stream_enhancement(provider: str, text: str, regenerate: bool = False):
+    """Yield enhancement output chunks as the provider produces them.
+
+    Cached responses are yielded whole; completed streams are cached like
+    enhance_with_openai / enhance_with_gemini results.
+    """
+    key = llm_ops.cache_key(provider, text)
+    if not regenerate:
+        cached = await llm_cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+    stream = llm_ops.stream_openai if provider == "openai" else llm_ops.stream_gemini
+    chunks = []
+    async for chunk in stream(text):
+        chunks.append(chunk)
+        yield chunk
+
+    enhanced = "".join(chunks)
+    if enhanced != text:
+        await llm_cache.set(key, enhanced)
+
+def sse_event(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+async def enhance_with_both(text: str, regenerate: bool = False) -> str:
+    """Run OpenAI then Gemini over each resume section concurrently.
+
+    Every section is its own task, so it moves on to Gemini as soon as its
+    OpenAI stage finishes, and end-to-end latency is roughly that of the
+    slowest section rather than two full-document generations. Text before
+    the first heading (name, contact details) is passed through unchanged.
+    """
+    blocks = list(section_tokenizer.blocks(text))
+    if sum(1 for name, _, _ in blocks if name) < 2:
+        return await enhance_with_gemini(await enhance_with_openai(text, regenerate), regenerate)
+
+    async def enhance_block(name, content):
+        if name is None:
+            return content
+        if not content:
+            return name.upper()
+        staged = await enhance_with_openai(content, regenerate)
+        enhanced = await enhance_with_gemini(staged, regenerate)
+        return f"{name.upper()}\n{enhanced.strip()}"
+
+    parts = await asyncio.gather(*(enhance_block(name, content) for name, _, content in blocks))
+    return "\n\n".join(parts)
+
+async def enhance_text(text: str, enhancement_type: str, regenerate: bool = False) -> str:
+    if enhancement_type == "openai":
+        return await enhance_with_openai(text, regenerate)
+    elif enhancement_type == "gemini":
+        return await enhance_with_gemini(text, regenerate)
+    else:
+        return await enhance_with_both(text, regenerate)
+
+async def save_enhancement(original_resume_id: str, user_id: str, enhancement_type: str, enhanced_text: str,
+                           usage: Optional[dict] = None) -> dict:
+    """Parse and score enhanced text, store it (score embedded) in enhanced_resumes and return the API payload.
+
+    ``usage`` is the LLM token usage that produced the text (see prompt_builder.summarize_usage).
+    """
+    enhanced_sections = parse_resume_sections(enhanced_text)
+
+    enhanced_resume = EnhancedResume(
+        original_resume_id=original_resume_id,
+        enhanced_text=enhanced_text,
+        enhanced_sections=enhanced_sections,
+        enhancement_type=enhancement_type
     )
 
-    def _parse_entries(content):
-        entries = []
-        cur_h, cur_b = [], []
-        for raw in content.split('\n'):
-            s = raw.strip()
-            if not s:
-                continue
-            if s[0] in '-\u2022*\u00b7\u2013':
-                cur_b.append(s.lstrip('-\u2022*\u00b7\u2013 ').strip())
-            else:
-                if cur_b:
-                    entries.append((cur_h, cur_b))
-                    cur_h, cur_b = [s], []
-                else:
-                    cur_h.append(s)
-        if cur_h or cur_b:
-            entries.append((cur_h, cur_b))
-        return entries
-
-    def _split_date(line):
-        m = DATE_RE.search(line)
-        if m:
-            date_str = line[m.start():].strip()
-            left = line[:m.start()].strip().rstrip('|,\u2013- ').strip()
-            return left, date_str
-        if '|' in line:
-            parts = [p.strip() for p in line.split('|')]
-            return parts[0], ' | '.join(parts[1:])
-        return line, ''
-
-    def section_block(title):
-        return [
-            Spacer(1, 4),
-            Paragraph(title.upper(), sec_style),
-            HRFlowable(width='100%', thickness=0.8, color=ACCENT, spaceAfter=3),
-        ]
+    doc = enhanced_resume.model_dump()
+    doc['user_id'] = user_id
+    doc['created_at'] = doc['created_at'].isoformat()
+    doc['usage'] = usage
 
-    def render_entry(headers, bullets):
-        items = []
-        for i, h in enumerate(headers):
-            left, right = _split_date(h)
-            st = entry_title_style if i == 0 else entry_sub_style
-            dt = entry_date_style  if i == 0 else entry_date_sub
-            if right:
-                row = Table(
-                    [[Paragraph(left, st), Paragraph(right, dt)]],
-                    colWidths=['72%', '28%']
-                )
-                row.setStyle(TableStyle([
-                    ('VALIGN',        (0, 0), (-1, -1), 'TOP'),
-                    ('LEFTPADDING',   (0, 0), (-1, -1), 0),
-                    ('RIGHTPADDING',  (0, 0), (-1, -1), 0),
-                    ('TOPPADDING',    (0, 0), (-1, -1), 0),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 1),
-                ]))
-                items.append(row)
-            else:
-                items.append(Paragraph(h, st))
-        for b in bullets:
-            items.append(Paragraph(f'\u2022 {b}', bullet_style))
-        return items
-
-    story = []
-
-    # ── Header ──────────────────────────────────────────────────
-    full_name = resume_data.get('full_name', resume_data.get('id', 'Resume'))
-    story.append(Paragraph(full_name, name_style))
-
-    contact_parts = [p for p in [
-        resume_data.get('email', ''), resume_data.get('phone', '')
-    ] if p]
-    if contact_parts:
-        story.append(Paragraph('  |  '.join(contact_parts), contact_style))
-
-    story.append(HRFlowable(width='100%', thickness=1.5, color=ACCENT, spaceAfter=6))
-
-    # ── Sections ────────────────────────────────────────────────
-    for section in resume_data.get('sections', []):
-        sec_name = section['section_name']
-        content  = section.get('content', '')
-        story   += section_block(sec_name)
-
-        if 'skill' in sec_name.lower():
-            # Render skills as clean inline text
-            skills_text = '  •  '.join(
-                line.strip() for line in content.split('\n') if line.strip()
-            )
-            story.append(Paragraph(skills_text, plain_style))
-            continue
-
-        entries = _parse_entries(content)
-        if not entries:
-            story.append(Paragraph(content, plain_style))
-            continue
-
-        for headers, bullets in entries:
-            story += render_entry(headers, bullets)
-
-    doc.build(story)
-    result = buffer.getvalue()
-    buffer.close()
-    return result
-
-def generate_docx(resume_data: dict) -> bytes:
-    from docx.shared import Pt, RGBColor, Inches
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    from docx.oxml.ns import qn
-    from docx.oxml import OxmlElement
-
-    doc = Document()
-
-    for sec in doc.sections:
-        sec.top_margin    = Inches(0.55)
-        sec.bottom_margin = Inches(0.45)
-        sec.left_margin   = Inches(0.6)
-        sec.right_margin  = Inches(0.6)
-
-    # Reuse the default empty first paragraph for the name
-    name_para = doc.paragraphs[0]
-
-    ACCENT = RGBColor(0x1E, 0x3A, 0x5F)
-    BLACK  = RGBColor(0x1A, 0x1A, 0x1A)
-    MGRAY  = RGBColor(0x55, 0x55, 0x55)
-
-    DATE_RE = re.compile(
-        r'(jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*[\s,.]+\d{4}'
-        r'|\bpresent\b|\d{4}\s*[-\u2013]\s*(?:\d{4}|present)',
-        re.IGNORECASE
-    )
+    new_ats_score = calculate_ats_score(enhanced_text, enhanced_sections)
+    new_ats_score.resume_id = enhanced_resume.id
+    score_doc = new_ats_score.model_dump()
+    score_doc['user_id'] = user_id
+    score_doc['created_at'] = score_doc['created_at'].isoformat()
+    await resume_store.insert("enhanced_resumes", doc, score_doc)
 
-    def sp(para, before=0, after=2):
-        para.paragraph_format.space_before = Pt(before)
-        para.paragraph_format.space_after  = Pt(after)
-
-    def add_hr(color='1E3A5F', sz='8'):
-        p = doc.add_paragraph()
-        sp(p, 0, 1)
-        pPr = p._p.get_or_add_pPr()
-        pBdr = OxmlElement('w:pBdr')
-        bottom = OxmlElement('w:bottom')
-        bottom.set(qn('w:val'), 'single')
-        bottom.set(qn('w:sz'), sz)
-        bottom.set(qn('w:space'), '1')
-        bottom.set(qn('w:color'), color)
-        pBdr.append(bottom)
-        pPr.append(pBdr)
-
-    def set_right_tab(para, pos_twips=10512):
-        """Right-aligned tab stop so name\tdate aligns to right margin."""
-        pPr = para._p.get_or_add_pPr()
-        tabs_el = OxmlElement('w:tabs')
-        tab_el  = OxmlElement('w:tab')
-        tab_el.set(qn('w:val'), 'right')
-        tab_el.set(qn('w:pos'), str(pos_twips))
-        tabs_el.append(tab_el)
-        pPr.append(tabs_el)
-
-    def _parse_entries(content):
-        entries = []
-        cur_h, cur_b = [], []
-        for raw in content.split('\n'):
-            s = raw.strip()
-            if not s:
-                continue
-            if s[0] in '-\u2022*\u00b7\u2013':
-                cur_b.append(s.lstrip('-\u2022*\u00b7\u2013 ').strip())
-            else:
-                if cur_b:
-                    entries.append((cur_h, cur_b))
-                    cur_h, cur_b = [s], []
-                else:
-                    cur_h.append(s)
-        if cur_h or cur_b:
-            entries.append((cur_h, cur_b))
-        return entries
-
-    def _split_date(line):
-        m = DATE_RE.search(line)
-        if m:
-            date_str = line[m.start():].strip()
-            left = line[:m.start()].strip().rstrip('|,\u2013- ').strip()
-            return left, date_str
-        if '|' in line:
-            parts = [p.strip() for p in line.split('|')]
-            return parts[0], ' | '.join(parts[1:])
-        return line, ''
-
-    # ── Name ────────────────────────────────────────────────────
-    full_name = resume_data.get('full_name', resume_data.get('id', 'Resume'))
-    name_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    sp(name_para, 0, 2)
-    nr = name_para.add_run(full_name)
-    nr.bold = True
-    nr.font.size = Pt(22)
-    nr.font.color.rgb = BLACK
-
-    # ── Contact ─────────────────────────────────────────────────
-    contact_parts = [p for p in [resume_data.get('email', ''), resume_data.get('phone', '')] if p]
-    if contact_parts:
-        cp = doc.add_paragraph(' | '.join(contact_parts))
-        cp.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        sp(cp, 0, 4)
-        for r in cp.runs:
-            r.font.size = Pt(9)
-            r.font.color.rgb = MGRAY
-
-    add_hr(color='1E3A5F', sz='12')
-
-    # ── Sections ────────────────────────────────────────────────
-    for section in resume_data.get('sections', []):
-        sec_name = section['section_name']
-        content  = section.get('content', '')
-
-        sh = doc.add_paragraph()
-        sp(sh, 8, 1)
-        sr = sh.add_run(sec_name.upper())
-        sr.bold = True
-        sr.font.size = Pt(10)
-        sr.font.color.rgb = ACCENT
-        add_hr(color='1E3A5F', sz='8')
-
-        if 'skill' in sec_name.lower():
-            skills_text = ' • '.join(
-                line.strip() for line in content.split('\n') if line.strip()
-            )
-            sp_para = doc.add_paragraph(skills_text)
-            sp(sp_para, 1, 3)
-            for r in sp_para.runs:
-                r.font.size = Pt(9.5)
-                r.font.color.rgb = BLACK
-            continue
-
-        entries = _parse_entries(content)
-        if not entries:
-            pp = doc.add_paragraph(content)
-            sp(pp, 1, 2)
-            for r in pp.runs:
-                r.font.size = Pt(9.5)
-            continue
-
-        for headers, bullets in entries:
-            for i, h in enumerate(headers):
-                left, right = _split_date(h)
-                ep = doc.add_paragraph()
-                sp(ep, 4 if i == 0 else 0, 1)
-                if right:
-                    set_right_tab(ep)
-                    rl = ep.add_run(left)
-                    rl.bold   = (i == 0)
-                    rl.italic = (i > 0)
-                    rl.font.size      = Pt(9.5)
-                    rl.font.color.rgb = BLACK if i == 0 else MGRAY
-                    rd = ep.add_run('\t' + right)
-                    rd.font.size      = Pt(9)
-                    rd.font.color.rgb = MGRAY
-                else:
-                    rl = ep.add_run(h)
-                    rl.bold   = (i == 0)
-                    rl.italic = (i > 0)
-                    rl.font.size      = Pt(9.5)
-                    rl.font.color.rgb = BLACK if i == 0 else MGRAY
-            for b in bullets:
-                bp = doc.add_paragraph(style='List Bullet')
-                sp(bp, 0, 1)
-                br = bp.add_run(b)
-                br.font.size      = Pt(9.5)
-                br.font.color.rgb = BLACK
+    return {
+        "enhanced_resume_id": enhanced_resume.id,
+        "enhanced_text": enhanced_text,
+        "enhanced_sections": [s.model_dump() for s in enhanced_sections],
+        "new_ats_score": new_ats_score.model_dump(),
+        "usage": usage
+    }
 
+async def coalesced_enhancement(resume: dict, user_id: str, enhancement_type: str, regenerate: bool = False) -> dict:
+    """Enhance and store a resume once for identical concurrent requests.
+
+    Double-clicks and client retries share one upstream LLM call and one
+    enhanced_resumes document: in-process through SingleFlight, and across
+    workers through a lock document in enhancement_locks. A regenerate
+    request only joins a call still in flight, never a finished one.
+    """
+    key = f"enhance:{user_id}:{resume['id']}:{enhancement_type}:{int(regenerate)}"
+
+    async def run():
+        with track_usage() as records:
+            enhanced_text = await enhance_text(resume['raw_text'], enhancement_type, regenerate)
+        usage = summarize_usage(records)
+        logger.info(f"Enhancement {resume['id']} ({enhancement_type}): {usage['calls']} LLM calls, "
+                    f"{usage['tokens_in']} tokens in, {usage['tokens_out']} tokens out")
+        return await save_enhancement(resume['id'], user_id, enhancement_type, enhanced_text, usage)
+
+    return await enhancement_flights.do(key, lambda: enhancement_locks.do(key, run, reuse_result=not regenerate))
+
+async def run_enhancement_job(payload: Dict[str, Any], user_id: str) -> dict:
+    """Job handler for "enhance" jobs queued by /resume/enhance/jobs."""
+    resume = await resume_store.get(payload["resume_id"], {"_id": 0}, user_id=user_id)
+    if not resume:
+        raise ValueError("Resume not found")
+    return await coalesced_enhancement(resume, user_id, payload["enhancement_type"], payload.get("regenerate", False))
+
+JOB_HANDLERS = {"enhance": run_enhancement_job}
+job_worker = JobWorker(job_queue, JOB_HANDLERS, concurrency=ENHANCE_JOB_CONCURRENCY)
+
+# format -> (media type, file extension)
+DOWNLOAD_FORMATS = {
+    "pdf": ("application/pdf", "pdf"),
+    "docx": ("application/vnd.openxmlformats-officedocument.wordprocessingml.document", "docx"),
+    "latex": ("application/x-tex", "tex"),
+    "bundle": ("application/zip", "zip"),
+}
+# Files in a format=bundle ZIP; PDF and DOCX are already compressed
+BUNDLE_FORMATS = {"pdf": zipfile.ZIP_STORED, "docx": zipfile.ZIP_STORED, "latex": zipfile.ZIP_DEFLATED}
+
+async def ensure_layout(resume: dict, collection) -> dict:
+    """The resume's stored layout, rebuilt and saved on the document when missing or stale.
+
+    Every format renders from this, so a resume is parsed once per version
+    rather than once per format and download.
+    """
+    if layout_is_current(resume):
+        return resume['layout']
+    layout = build_layout(resume)
+    await collection.update_one({"id": resume["id"]}, {"$set": {"layout": layout}})
+    return layout
+
+def render_key(layout: dict, format: str) -> str:
+    """Everything a rendered file depends on: layout content and version, format, renderer version."""
+    return f"{layout['source_hash']}:{format}:l{layout['version']}-{renderer_version(format)}"
+
+def download_etag(key: str) -> str:
+    content_hash, format, version = key.split(":")
+    return f'"{content_hash[:32]}-{format}-{version}"'
+
+def build_bundle(files: Dict[str, bytes]) -> bytes:
     buffer = io.BytesIO()
-    doc.save(buffer)
-    buffer.seek(0)
+    with zipfile.ZipFile(buffer, "w") as bundle:
+        for format, data in files.items():
+            bundle.writestr(f"resume.{DOWNLOAD_FORMATS[format][1]}", data, compress_type=BUNDLE_FORMATS[format])
     return buffer.getvalue()
 
-def escape_latex(text: str) -> str:
-    """Escape special LaTeX characters in plain text."""
-    if not text:
-        return ""
-    for char, rep in [
-        ('&', r'\&'), ('%', r'\%'), ('$', r'\$'),
-        ('#', r'\#'), ('_', r'\_'),
-    ]:
-        text = text.replace(char, rep)
-    return text
-
-def generate_latex(resume_data: dict) -> str:
-    """Fill the ATS LaTeX template with resume data."""
-    template_path = ROOT_DIR / 'resume_template.tex'
-    with open(template_path, 'r', encoding='utf-8') as f:
-        template = f.read()
-
-    sections = {
-        s['section_name'].lower(): s.get('content', '')
-        for s in resume_data.get('sections', [])
-    }
-
-    def lines_of(text, n):
-        ls = [l.strip() for l in text.split('\n') if l.strip()]
-        return ls[:n] + [''] * max(0, n - len(ls))
-
-    exp_lines = lines_of(sections.get('experience', ''), 6)
-    edu_lines = lines_of(sections.get('education', ''), 3)
-
-    vals = {
-        'name':               escape_latex(resume_data.get('full_name', '')),
-        'job_title':          '',
-        'location_link':      'https://maps.google.com',
-        'location':           '',
-        'phone':              resume_data.get('phone', ''),
-        'email':              resume_data.get('email', ''),
-        'linkedin_url':       'https://linkedin.com',
-        'github_url':         'https://github.com',
-        'kaggle_url':         'https://kaggle.com',
-        'portfolio_url':      'https://example.com',
-        'degree':             escape_latex(edu_lines[0]),
-        'graduation_year':    '',
-        'university':         escape_latex(edu_lines[1]),
-        'cgpa':               '',
-        'professional_summary': escape_latex(sections.get('summary', '')),
-        'languages':          escape_latex(sections.get('skills', '')),
-        'ml_skills':          '',
-        'genai_skills':       '',
-        'ml_libraries':       '',
-        'databases':          '',
-        'developer_tools':    '',
-        'company_1':          '',
-        'duration_1':         '',
-        'location_1':         '',
-        'experience_point_1': escape_latex(exp_lines[0]),
-        'experience_point_2': escape_latex(exp_lines[1]),
-        'experience_point_3': escape_latex(exp_lines[2]),
-        'company_2':          '',
-        'duration_2':         '',
-        'location_2':         '',
-        'experience_point_4': escape_latex(exp_lines[3]),
-        'experience_point_5': escape_latex(exp_lines[4]),
-        'experience_point_6': escape_latex(exp_lines[5]),
-        'project_1_name':     '',
-        'project_1_tech':     '',
-        'project_1_demo':     'https://example.com',
-        'project_1_github':   'https://github.com',
-        'project_1_desc_1':   '',
-        'project_1_desc_2':   '',
-        'project_2_name':     '',
-        'project_2_tech':     '',
-        'project_2_demo':     'https://example.com',
-        'project_2_github':   'https://github.com',
-        'project_2_desc_1':   '',
-        'project_2_desc_2':   '',
-        'project_3_name':     '',
-        'project_3_tech':     '',
-        'project_3_desc_1':   '',
-        'project_3_desc_2':   '',
-        'certifications':     '',
-        'achievement_1':      '',
-        'achievement_2':      '',
-        'achievement_3':      '',
-        'spoken_languages':   'English',
-        'interests':          '',
-    }
-
-    for key, value in vals.items():
-        template = template.replace('{{' + key + '}}', value)
+async def render_bundle(layout: dict) -> bytes:
+    """Render every format concurrently in the render pool and ZIP them together."""
+    formats = list(BUNDLE_FORMATS)
+    files = await asyncio.gather(*(cached_render(layout, f, render_key(layout, f)) for f in formats))
+    return await asyncio.to_thread(build_bundle, dict(zip(formats, files)))
+
+async def cached_render(layout: dict, format: str, key: str) -> bytes:
+    """Rendered file from the render cache, rendering and storing it on a miss."""
+    data = await render_cache.get(key)
+    if data is None:
+        if format == "bundle":
+            data = await render_bundle(layout)
+        else:
+            data = await render_pool.render(layout, format)
+        await render_cache.set(key, data)
+    return data
 
-    return template
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
 
 # API Endpoints
 
@@ -741,32 +609,36 @@ async def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depend
 async def root():
     return {"message": "CareerArchitect API - AI Resume Builder"}
 
+@api_router.get("/ready")
+async def ready():
+    """200 once start-up warm-up has finished; 503 until then, for load balancer readiness checks."""
+    if not readiness["ready"]:
+        raise HTTPException(
+            status_code=503,
+            detail="Warming up",
+            headers={"Retry-After": str(WARMUP_RETRY_SECONDS)}
+        )
+    return {"status": "ready", **readiness}
+
+@api_router.get("/cache/stats")
+async def cache_stats():
+    return {"upload": upload_cache.stats(), "llm": llm_cache.stats(), "render": render_cache.stats()}
+
 @api_router.post("/resume/upload")
 async def upload_resume(file: UploadFile = File(...), user_id: str = Depends(get_current_user_id)):
     try:
-        content = await file.read()
-        
-        if file.filename.endswith('.pdf'):
-            text = extract_text_from_pdf(content)
-        elif file.filename.endswith('.docx'):
-            text = extract_text_from_docx(content)
-        else:
-            raise HTTPException(status_code=400, detail="Only PDF and DOCX files are supported")
-        
-        sections = parse_resume_sections(text)
+        text, sections, ats_score = await analyze_upload(file)
         resume = ResumeData(raw_text=text, sections=sections)
         
         doc = resume.model_dump()
         doc['user_id'] = user_id
         doc['created_at'] = doc['created_at'].isoformat()
-        await db.resumes.insert_one(doc)
         
-        ats_score = calculate_ats_score(text, sections)
         ats_score.resume_id = resume.id
         score_doc = ats_score.model_dump()
         score_doc['user_id'] = user_id
         score_doc['created_at'] = score_doc['created_at'].isoformat()
-        await db.ats_scores.insert_one(score_doc)
+        await resume_store.insert("resumes", doc, score_doc)
         
         return {
             "resume_id": resume.id,
@@ -774,6 +646,8 @@ async def upload_resume(file: UploadFile = File(...), user_id: str = Depends(get
             "sections": [s.model_dump() for s in sections],
             "ats_score": ats_score.model_dump()
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -800,14 +674,13 @@ async def create_manual_resume(input_data: ManualResumeInput, user_id: str = Dep
         doc['full_name'] = input_data.full_name
         doc['email'] = input_data.email
         doc['phone'] = input_data.phone
-        await db.resumes.insert_one(doc)
         
         ats_score = calculate_ats_score(raw_text, sections)
         ats_score.resume_id = resume.id
         score_doc = ats_score.model_dump()
         score_doc['user_id'] = user_id
         score_doc['created_at'] = score_doc['created_at'].isoformat()
-        await db.ats_scores.insert_one(score_doc)
+        await resume_store.insert("resumes", doc, score_doc)
         
         return {
             "resume_id": resume.id,
@@ -821,7 +694,7 @@ async def create_manual_resume(input_data: ManualResumeInput, user_id: str = Dep
 @api_router.post("/resume/enhance")
 async def enhance_resume(request: EnhanceRequest, user_id: str = Depends(get_current_user_id)):
     try:
-        resume = await db.resumes.find_one({"id": request.resume_id}, {"_id": 0})
+        resume = await resume_store.get(request.resume_id, {"_id": 0})
         if not resume:
             raise HTTPException(status_code=404, detail="Resume not found")
         
@@ -829,95 +702,217 @@ async def enhance_resume(request: EnhanceRequest, user_id: str = Depends(get_cur
         if resume.get("user_id") != user_id:
             raise HTTPException(status_code=403, detail="Unauthorized")
         
-        enhanced_text = ""
-        enhancement_type = request.enhancement_type
-        
-        if enhancement_type == "openai":
-            enhanced_text = await enhance_with_openai(resume['raw_text'])
-        elif enhancement_type == "gemini":
-            enhanced_text = await enhance_with_gemini(resume['raw_text'])
-        else:
-            openai_enhanced = await enhance_with_openai(resume['raw_text'])
-            enhanced_text = await enhance_with_gemini(openai_enhanced)
-        
-        enhanced_sections = parse_resume_sections(enhanced_text)
-        
-        enhanced_resume = EnhancedResume(
-            original_resume_id=request.resume_id,
-            enhanced_text=enhanced_text,
-            enhanced_sections=enhanced_sections,
-            enhancement_type=enhancement_type
+        return await coalesced_enhancement(resume, user_id, request.enhancement_type, request.regenerate)
+    except HTTPException:
+        raise
+    except ProviderUnavailable as e:
+        logger.error(f"Enhancement provider unavailable: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Enhancement provider is unavailable, please retry shortly",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
         )
+    except LLMError as e:
+        logger.error(f"Enhancement provider error: {e}")
+        raise HTTPException(status_code=502, detail=str(e))
+    except Exception as e:
+        logger.error(f"Enhancement error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.post("/resume/enhance/stream")
+async def enhance_resume_stream(request: EnhanceRequest, user_id: str = Depends(get_current_user_id)):
+    """Server-sent events variant of /resume/enhance.
+
+    Emits ``draft`` events with first-stage output for "both", ``token``
+    events with the final provider's output, then a ``done`` event carrying
+    the same payload as /resume/enhance (or ``error``).
+    """
+    resume = await resume_store.get(request.resume_id, {"_id": 0})
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    
+    # Verify ownership
+    if resume.get("user_id") != user_id:
+        raise HTTPException(status_code=403, detail="Unauthorized")
+    
+    enhancement_type = request.enhancement_type
+    regenerate = request.regenerate
+
+    async def events():
+        # The generator runs in the response task, so usage is tracked around it here
+        with track_usage() as records:
+            try:
+                text = resume['raw_text']
+                if enhancement_type == "openai":
+                    provider = "openai"
+                elif enhancement_type == "gemini":
+                    provider = "gemini"
+                else:
+                    draft = []
+                    async for chunk in stream_enhancement("openai", text, regenerate):
+                        draft.append(chunk)
+                        yield sse_event("draft", {"text": chunk})
+                    text = "".join(draft)
+                    provider = "gemini"
+
+                final = []
+                async for chunk in stream_enhancement(provider, text, regenerate):
+                    final.append(chunk)
+                    yield sse_event("token", {"text": chunk})
+
+                result = await save_enhancement(request.resume_id, user_id, enhancement_type, "".join(final),
+                                                summarize_usage(records))
+                yield sse_event("done", result)
+            except ProviderUnavailable as e:
+                logger.error(f"Streaming enhancement provider unavailable: {e}")
+                yield sse_event("error", {"detail": str(e), "status": 503, "retry_after": e.retry_after})
+            except Exception as e:
+                logger.error(f"Streaming enhancement error: {e}")
+                yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@api_router.post("/resume/enhance/jobs", status_code=202)
+async def submit_enhancement_job(request: EnhanceRequest, user_id: str = Depends(get_current_user_id)):
+    try:
+        resume = await resume_store.get(request.resume_id, {"_id": 0, "user_id": 1})
+        if not resume:
+            raise HTTPException(status_code=404, detail="Resume not found")
         
-        doc = enhanced_resume.model_dump()
-        doc['user_id'] = user_id
-        doc['created_at'] = doc['created_at'].isoformat()
-        await db.enhanced_resumes.insert_one(doc)
+        # Verify ownership
+        if resume.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="Unauthorized")
         
-        new_ats_score = calculate_ats_score(enhanced_text, enhanced_sections)
-        new_ats_score.resume_id = enhanced_resume.id
-        score_doc = new_ats_score.model_dump()
-        score_doc['user_id'] = user_id
-        score_doc['created_at'] = score_doc['created_at'].isoformat()
-        await db.ats_scores.insert_one(score_doc)
+        job_id = await job_queue.enqueue("enhance", request.model_dump(), user_id)
+        return {"job_id": job_id, "status": "queued"}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Enhancement job submit error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/resume/enhance/jobs/{job_id}")
+async def get_enhancement_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    try:
+        job = await job_queue.get(job_id)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job not found")
+        
+        # Verify ownership
+        if job.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="Unauthorized")
         
         return {
-            "enhanced_resume_id": enhanced_resume.id,
-            "enhanced_text": enhanced_text,
-            "enhanced_sections": [s.model_dump() for s in enhanced_sections],
-            "new_ats_score": new_ats_score.model_dump()
+            "job_id": job["id"],
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "result": job.get("result"),
+            "error": job.get("error"),
+            "created_at": job["created_at"],
+            "updated_at": job["updated_at"]
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Enhancement error: {e}")
+        logger.error(f"Enhancement job status error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @api_router.get("/resume/{resume_id}")
 async def get_resume(resume_id: str, user_id: str = Depends(get_current_user_id)):
     try:
-        resume = await db.resumes.find_one({"id": resume_id}, {"_id": 0})
-        if not resume:
+        found = await resume_store.get_with_score(resume_id)
+        if not found:
             raise HTTPException(status_code=404, detail="Resume not found")
+        resume, ats_score = found
         
         # Verify ownership
         if resume.get("user_id") != user_id:
             raise HTTPException(status_code=403, detail="Unauthorized")
         
-        ats_score = await db.ats_scores.find_one({"resume_id": resume_id}, {"_id": 0})
-        
         return {
             "resume": resume,
             "ats_score": ats_score
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Get resume error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.post("/resume/{resume_id}/match")
+async def match_resume(resume_id: str, request: JobMatchRequest, user_id: str = Depends(get_current_user_id)):
+    # numpy/scipy are loaded on first use (or by the start-up warm-up), not at import
+    from jd_matcher import VECTOR_VERSION, vectorize_resume, match_job_description
+    try:
+        if not request.job_description.strip():
+            raise HTTPException(status_code=400, detail="Job description is empty")
+
+        resume, collection = await resume_store.find_any(resume_id, {"_id": 0, "layout": 0, "ats_score": 0})
+        if not resume:
+            raise HTTPException(status_code=404, detail="Resume not found")
+        
+        # Verify ownership
+        if resume.get("user_id") != user_id:
+            raise HTTPException(status_code=403, detail="Unauthorized")
+        
+        # The resume vector is computed once and stored on the document
+        vector = resume.get("tfidf")
+        if not vector or vector.get("version") != VECTOR_VERSION:
+            sections = resume.get("sections") or resume.get("enhanced_sections") or []
+            texts = [s.get("content", "") for s in sections] or [resume.get("raw_text") or resume.get("enhanced_text", "")]
+            vector = vectorize_resume(texts)
+            await collection.update_one({"id": resume_id}, {"$set": {"tfidf": vector}})
+        
+        result = match_job_description(vector, request.job_description)
+        return {"resume_id": resume_id, **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Match error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@api_router.get("/resume/generate/{resume_id}")
 @api_router.post("/resume/generate/{resume_id}")
-async def generate_resume(resume_id: str, format: str = "pdf", user_id: str = Depends(get_current_user_id)):
+async def generate_resume(resume_id: str, format: str = "pdf", encoding: Optional[str] = None,
+                          if_none_match: Optional[str] = Header(None),
+                          user_id: str = Depends(get_current_user_id)):
+    """Download a resume as PDF, DOCX or LaTeX, or all three as a ZIP (``format=bundle``).
+
+    Returns the file itself with an ETag derived from the resume content, so
+    a repeat GET with If-None-Match gets 304 without re-rendering.
+    ``encoding=hex`` keeps the legacy ``{"file_data": <hex>, "format": ...}`` JSON.
+    """
     try:
-        resume = await db.resumes.find_one({"id": resume_id}, {"_id": 0})
+        if format not in DOWNLOAD_FORMATS:
+            raise HTTPException(status_code=400, detail="Format must be 'pdf', 'docx', 'latex' or 'bundle'")
+
+        resume, collection = await resume_store.find_any(resume_id, {"_id": 0, "tfidf": 0, "ats_score": 0})
         if not resume:
-            enhanced = await db.enhanced_resumes.find_one({"id": resume_id}, {"_id": 0})
-            if not enhanced:
-                raise HTTPException(status_code=404, detail="Resume not found")
-            resume = enhanced
+            raise HTTPException(status_code=404, detail="Resume not found")
         
         # Verify ownership
         if resume.get("user_id") != user_id:
             raise HTTPException(status_code=403, detail="Unauthorized")
         
-        if format == "pdf":
-            pdf_bytes = generate_pdf(resume)
-            return {"file_data": pdf_bytes.hex(), "format": "pdf"}
-        elif format == "docx":
-            docx_bytes = generate_docx(resume)
-            return {"file_data": docx_bytes.hex(), "format": "docx"}
-        elif format == "latex":
-            latex_str = generate_latex(resume)
-            latex_bytes = latex_str.encode('utf-8')
-            return {"file_data": latex_bytes.hex(), "format": "latex"}
-        else:
-            raise HTTPException(status_code=400, detail="Format must be 'pdf', 'docx', or 'latex'")
+        layout = await ensure_layout(resume, collection)
+        key = render_key(layout, format)
+        if encoding == "hex":
+            return {"file_data": (await cached_render(layout, format, key)).hex(), "format": format}
+
+        media_type, extension = DOWNLOAD_FORMATS[format]
+        etag = download_etag(key)
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers=headers)
+
+        headers["Content-Disposition"] = f'attachment; filename="resume.{extension}"'
+        return Response(content=await cached_render(layout, format, key), media_type=media_type, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Generate error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -940,6 +935,65 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+async def warm_mongo_pool():
+    # Concurrent pings each check out a connection, so the pool opens several
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(MONGO_WARM_CONNECTIONS)))
+
+async def bootstrap_indexes():
+    # Connection errors raise and are retried by warm_up. An index that fails to
+    # build (duplicate keys, conflicting options) will not fix itself on retry,
+    # so the app goes ready without it and /api/ready lists it
+    report = await ensure_indexes(db, collect_indexes(INDEX_OWNERS))
+    readiness["missing_indexes"] = [f"{name}.{index}" for name, entry in report.items() for index in entry["missing"]]
+    if readiness["missing_indexes"]:
+        logger.error(f"Serving without indexes {', '.join(readiness['missing_indexes'])}; index report: {report}")
+    await explain_hot_queries(db)
+
+async def warm_tokenizer():
+    await asyncio.to_thread(count_tokens, "warm up")
+
+async def warm_lazy_imports():
+    # Dependencies kept out of module import so the process starts fast
+    await asyncio.to_thread(llm_ops.load_providers)
+    await asyncio.to_thread(importlib.import_module, "jd_matcher")
+
+WARMUP_STEPS = (
+    ("mongo", warm_mongo_pool),
+    ("indexes", bootstrap_indexes),
+    ("render_pool", render_pool.warm),
+    ("extraction_pool", extraction_pool.warm),
+    ("tokenizer", warm_tokenizer),
+    ("lazy_imports", warm_lazy_imports),
+)
+
+async def warm_up():
+    """Run WARMUP_STEPS in order, retrying each until it succeeds, then report ready."""
+    started = time.perf_counter()
+    for name, step in WARMUP_STEPS:
+        step_started = time.perf_counter()
+        while True:
+            try:
+                await step()
+                break
+            except Exception as e:
+                logger.warning(f"Warm-up step {name} failed, retrying in {WARMUP_RETRY_SECONDS}s: {e}")
+                await asyncio.sleep(WARMUP_RETRY_SECONDS)
+        readiness["steps"][name] = round(time.perf_counter() - step_started, 3)
+    readiness["warmup_seconds"] = round(time.perf_counter() - started, 3)
+    readiness["ready"] = True
+    logger.info(f"Warm-up finished in {readiness['warmup_seconds']}s: {readiness['steps']}")
+
+async def startup():
+    if ENHANCE_JOB_CONCURRENCY > 0:
+        job_worker.start()
+    # Serve health checks while warming; /api/ready reports when it is done
+    warmup_tasks.add(asyncio.create_task(warm_up()))
+
+async def shutdown():
+    for task in warmup_tasks:
+        task.cancel()
+    await job_worker.stop()
+    client.close()
+    extraction_pool.shutdown()
+    render_pool.shutdown()
+    await llm_ops.aclose()
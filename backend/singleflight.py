@@ -0,0 +1,121 @@
+"""
+Single-flight coalescing of identical concurrent calls
+"""
+import asyncio
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List
+
+from pymongo import IndexModel
+from pymongo.errors import DuplicateKeyError
+
+Call = Callable[[], Awaitable[Any]]
+
+
+class SingleFlight:
+    """Concurrent callers with the same key share one in-flight call.
+
+    The shared call runs as its own task, so a caller that goes away (e.g. a
+    client disconnect) does not cancel it for everyone else.
+    """
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fn: Call) -> Any:
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fn())
+            self._calls[key] = future
+            future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future)
+
+
+class MongoSingleFlight:
+    """Single-flight across processes using a lock document per key.
+
+    The first caller inserts ``{"_id": key}`` and runs the call; others poll
+    the document until the leader stores its result there. Results stay
+    visible for ``result_ttl`` seconds so retries arriving just after
+    completion reuse them, unless ``do`` is called with ``reuse_result=False``.
+    The leader extends its lease every ``lease_seconds / 3``; a leader that
+    dies leaves a lock that expires after ``lease_seconds`` and is taken over
+    by the next caller.
+    """
+
+    def __init__(self, collection, lease_seconds: int = 180, result_ttl: int = 30, poll_interval: float = 0.5):
+        self.collection = collection
+        self.lease_seconds = lease_seconds
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+
+    def indexes(self) -> List[IndexModel]:
+        return [IndexModel("expires_at", name="expires_at_1", expireAfterSeconds=0)]
+
+    async def ensure_indexes(self):
+        await self.collection.create_indexes(self.indexes())
+
+    async def do(self, key: str, fn: Call, reuse_result: bool = True) -> Any:
+        """Run ``fn`` once across processes for concurrent callers of ``key``.
+
+        With ``reuse_result=False`` only a call that was still in flight when
+        this caller arrived is shared; a result finished earlier is discarded
+        and ``fn`` runs again.
+        """
+        owner = uuid.uuid4().hex
+        waiting_on = None
+        while True:
+            now = datetime.now(timezone.utc)
+            try:
+                await self.collection.insert_one({
+                    "_id": key,
+                    "owner": owner,
+                    "done": False,
+                    "expires_at": now + timedelta(seconds=self.lease_seconds),
+                })
+            except DuplicateKeyError:
+                # Clear an expired lock (dead leader or old result), then retry
+                expired = await self.collection.delete_one({"_id": key, "expires_at": {"$lt": now}})
+                if expired.deleted_count:
+                    continue
+                lock = await self.collection.find_one({"_id": key})
+                if lock is None:
+                    continue
+                if not lock.get("done"):
+                    waiting_on = lock["owner"]
+                    await asyncio.sleep(self.poll_interval)
+                elif reuse_result or lock["owner"] == waiting_on:
+                    return lock["result"]
+                else:
+                    await self.collection.delete_one({"_id": key, "owner": lock["owner"], "done": True})
+                continue
+            return await self._lead(key, owner, fn)
+
+    async def _heartbeat(self, key: str, owner: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            result = await self.collection.update_one(
+                {"_id": key, "owner": owner, "done": False},
+                {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.lease_seconds)}}
+            )
+            if result.matched_count == 0:
+                return
+
+    async def _lead(self, key: str, owner: str, fn: Call) -> Any:
+        heartbeat = asyncio.create_task(self._heartbeat(key, owner))
+        try:
+            result = await fn()
+        except BaseException:
+            await self.collection.delete_one({"_id": key, "owner": owner})
+            raise
+        finally:
+            heartbeat.cancel()
+        await self.collection.update_one(
+            {"_id": key, "owner": owner},
+            {"$set": {
+                "done": True,
+                "result": result,
+                "expires_at": datetime.now(timezone.utc) + timedelta(seconds=self.result_ttl),
+            }}
+        )
+        return result
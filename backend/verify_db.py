@@ -1,6 +1,7 @@
 """
 MongoDB Database Setup and Verification Script
-Run this to verify your MongoDB connection and create the database
+Run this to verify your MongoDB connection, create the database and its
+indexes, and check that the hot queries are served by an index
 """
 
 
@@ -10,6 +11,8 @@ from dotenv import load_dotenv
 from pathlib import Path
 import asyncio
 
+from db_indexes import collect_indexes, ensure_indexes, explain_hot_queries
+
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -49,10 +52,31 @@ async def verify_and_setup_database():
         
         # Show what collections will be used
         print(f"\n📋 Collections that will be created by the app:")
-        print("   - resumes: Store original resume data")
-        print("   - ats_scores: Store ATS scoring results")
+        print("   - resumes: Store original resume data and its ATS score")
+        print("   - ats_scores: ATS scores of resumes saved before scores were embedded")
         print("   - enhanced_resumes: Store AI-enhanced resumes")
         
+        # Create missing indexes and check the hot queries use them
+        from server import INDEX_OWNERS
+        report = await ensure_indexes(db, collect_indexes(INDEX_OWNERS))
+        print("\n🗂️  Indexes:")
+        for name, entry in report.items():
+            status = "✅" if not entry["missing"] else "❌"
+            existing = await db[name].index_information()
+            print(f"   {status} {name}: {', '.join(n for n in existing if n != '_id_') or '(none)'}")
+            if entry["missing"]:
+                print(f"      missing: {', '.join(entry['missing'])}")
+            if entry["extra"]:
+                print(f"      not defined by the app: {', '.join(entry['extra'])}")
+
+        print("\n🔎 Query plans:")
+        for plan in await explain_hot_queries(db):
+            query = f"{plan['collection']} {plan['filter']}" + (f" sort {plan['sort']}" if plan["sort"] else "")
+            if plan["collection_scan"]:
+                print(f"   ❌ {query}: collection scan")
+            else:
+                print(f"   ✅ {query}: {plan['index']}")
+
         # Database stats
         stats = await db.command("dbStats")
         print(f"\n📊 Database Statistics:")
@@ -0,0 +1,63 @@
+"""
+Process pool shared by rendering and extraction
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Workers start from a clean forkserver (spawn where unavailable) rather than a
+# fork of the API process, whose Motor and to_thread threads may hold locks
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+
+class WorkerPool:
+    """Process pool that keeps CPU-bound work off the event loop.
+
+    ``initializer`` runs once in each worker process to load and warm up what
+    its tasks need. The pool starts on first use or on ``warm``, and is
+    recycled when a worker dies, so one crash does not break every later call.
+    """
+
+    def __init__(self, name: str, workers: int, initializer: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.workers = max(1, workers)
+        self.initializer = initializer
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=self.initializer,
+                                                 mp_context=multiprocessing.get_context(POOL_START_METHOD))
+        return self._executor
+
+    async def warm(self):
+        """Start every worker now, so no request waits for a process to spawn and warm up."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run ``fn(*args)`` in a worker; BrokenProcessPool is re-raised once the pool is recycled."""
+        executor = self._get_executor()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a hostile file); start a fresh pool next time.
+            # Other callers on the same dead pool land here too: only the first
+            # recycles it, so a pool started since then is left alone
+            if self._executor is executor:
+                logger.error(f"{self.name} worker crashed, recycling process pool")
+                self.shutdown()
+            raise
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
@@ -54,20 +54,22 @@ const DashboardPage = () => {
     }
   };
 
+  const DOWNLOAD_EXTENSIONS = { latex: 'tex', bundle: 'zip' };
+
   const handleDownload = async (format) => {
     try {
       const targetId = enhancedData ? enhancedData.enhanced_resume_id : resumeId;
-      const response = await axios.post(`${API}/resume/generate/${targetId}`, null, {
-        params: { format }
+      const response = await axios.get(`${API}/resume/generate/${targetId}`, {
+        params: { format },
+        responseType: 'blob'
       });
-      
-      const blob = new Blob([new Uint8Array(response.data.file_data.match(/.{1,2}/g).map(byte => parseInt(byte, 16)))]);
-      const url = window.URL.createObjectURL(blob);
+
+      const url = window.URL.createObjectURL(response.data);
       const a = document.createElement('a');
       a.href = url;
-      a.download = `resume.${format === 'latex' ? 'tex' : format}`;
+      a.download = `resume.${DOWNLOAD_EXTENSIONS[format] || format}`;
       a.click();
-      toast.success(`Resume downloaded as ${format.toUpperCase()}`);
+      toast.success(format === 'bundle' ? "Resume downloaded as ZIP" : `Resume downloaded as ${format.toUpperCase()}`);
     } catch (error) {
       console.error(error);
       toast.error("Failed to download resume");
@@ -279,6 +281,14 @@ const DashboardPage = () => {
                   >
                     <Download className="mr-2 h-4 w-4" /> LaTeX
                   </Button>
+                  <Button
+                    data-testid="download-original-bundle-btn"
+                    onClick={() => handleDownload("bundle")}
+                    variant="outline"
+                    className="rounded-sm"
+                  >
+                    <Download className="mr-2 h-4 w-4" /> All (ZIP)
+                  </Button>
                 </div>
               </div>
               <div className="space-y-6">
@@ -328,6 +338,13 @@ const DashboardPage = () => {
                     >
                       <Download className="mr-2 h-4 w-4" /> LaTeX
                     </Button>
+                    <Button
+                      data-testid="download-enhanced-bundle-btn"
+                      onClick={() => handleDownload("bundle")}
+                      className="bg-[#10B981] hover:bg-[#0D9668] text-white rounded-sm"
+                    >
+                      <Download className="mr-2 h-4 w-4" /> All (ZIP)
+                    </Button>
                   </div>
                 </div>
                 <div className="space-y-6">
@@ -0,0 +1,74 @@
+"""
+Import-time budget for the API process, measured with ``python -X importtime``
+"""
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "backend")
+
+# Cold ``import server`` must stay under this many seconds
+IMPORT_TIME_BUDGET = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "1.0"))
+
+# Loaded on first use (or by the start-up warm-up), never by importing the app
+LAZY_MODULES = ("reportlab", "docx", "PyPDF2", "openai", "google.generativeai", "numpy", "scipy")
+
+
+def run_python(code, **env):
+    return subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=BACKEND_DIR,
+        env={**os.environ, "MONGO_URL": "mongodb://localhost:27017", "DB_NAME": "import_time_test", **env},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+
+def import_profile(module):
+    """``{module: cumulative microseconds}`` for everything imported by ``import module``."""
+    profile = {}
+    for line in run_python(f"import {module}").stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def imported(profile, package):
+    return [name for name in profile if name == package or name.startswith(package + ".")]
+
+
+def test_server_import_skips_heavy_dependencies():
+    profile = import_profile("server")
+    loaded = {package: imported(profile, package) for package in LAZY_MODULES}
+    assert not any(loaded.values()), {package: names[:3] for package, names in loaded.items() if names}
+
+
+def test_server_import_time_budget():
+    # Best of three, so a busy machine or a first run writing .pyc files does not fail the budget
+    seconds = min(import_profile("server")["server"] for _ in range(3)) / 1e6
+    print(f"import server: {seconds:.3f}s (budget {IMPORT_TIME_BUDGET}s)")
+    assert seconds < IMPORT_TIME_BUDGET
+
+
+def test_unconfigured_providers_are_never_loaded():
+    code = (
+        "import sys, llm_helper\n"
+        "llm_helper.load_providers()\n"
+        "print('openai' in sys.modules, 'google.generativeai' in sys.modules)"
+    )
+    env = {"OPENAI_API_KEY": "", "GEMINI_API_KEY": "", "EMERGENT_LLM_KEY": ""}
+    assert run_python(code, **env).stdout.split() == ["False", "False"]
+    assert run_python(code, **{**env, "OPENAI_API_KEY": "sk-test"}).stdout.split() == ["True", "False"]
+
+
+def test_latex_renders_without_loading_pdf_or_docx_libraries():
+    code = (
+        "import sys\n"
+        "from renderers import WARMUP_LAYOUT, render_resume\n"
+        "render_resume(WARMUP_LAYOUT, 'latex')\n"
+        "print('reportlab' in sys.modules, 'docx' in sys.modules)"
+    )
+    assert run_python(code).stdout.split() == ["False", "False"]
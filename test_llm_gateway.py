@@ -0,0 +1,173 @@
+"""
+Tests for the LLM provider gateway against a local fake OpenAI-compatible server
+"""
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "backend"))
+
+import llm_helper  # noqa: E402
+from llm_gateway import LLMError, ProviderGateway, ProviderUnavailable, TokenBucket  # noqa: E402
+
+
+class FakeProvider(BaseHTTPRequestHandler):
+    """Answers chat completions with the next scripted status (200 once the script runs out)."""
+    script = []
+    requests = 0
+    retry_after = "0.01"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        cls = type(self)
+        cls.requests += 1
+        status = cls.script.pop(0) if cls.script else 200
+
+        if status == 200:
+            body = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": "gpt-4o",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": "Enhanced resume"}}],
+            }
+        else:
+            body = {"error": {"message": f"fake status {status}", "type": "test"}}
+        data = json.dumps(body).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        if status == 429:
+            self.send_header("Retry-After", cls.retry_after)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeProvider)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    FakeProvider.script = []
+    FakeProvider.requests = 0
+    FakeProvider.retry_after = "0.01"
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setenv("OPENAI_BASE_URL", f"http://127.0.0.1:{server.server_address[1]}/v1")
+    monkeypatch.setattr(llm_helper, "_openai_client", None)
+    monkeypatch.setattr(llm_helper, "openai_gateway", ProviderGateway(
+        "openai", rate_per_minute=60000, burst=10, max_retries=3,
+        base_delay=0.01, max_delay=0.05, failure_threshold=5, reset_timeout=0.2
+    ))
+    yield FakeProvider
+
+    server.shutdown()
+    server.server_close()
+
+
+def enhance(text="Original resume"):
+    async def run():
+        try:
+            return await llm_helper.enhance_with_openai(text)
+        finally:
+            await llm_helper.aclose()
+    return asyncio.run(run())
+
+
+def test_retries_throttling_and_server_errors(provider):
+    provider.script = [429, 500, 503]
+    assert enhance() == "Enhanced resume"
+    assert provider.requests == 4
+    # Throttling slowed the bucket down; the successful call started recovering it
+    bucket = llm_helper.openai_gateway.bucket
+    assert bucket.rate < bucket.max_rate
+
+
+def test_gives_up_with_provider_unavailable(provider):
+    provider.script = [500] * 10
+    with pytest.raises(ProviderUnavailable):
+        enhance()
+    assert provider.requests == 4
+
+
+def test_long_retry_after_is_passed_on_instead_of_waited(provider):
+    provider.script = [429]
+    provider.retry_after = "120"
+    with pytest.raises(ProviderUnavailable) as error:
+        enhance()
+    assert error.value.retry_after == 120
+    assert provider.requests == 1
+
+
+def test_client_errors_are_not_retried(provider):
+    provider.script = [400]
+    with pytest.raises(LLMError) as error:
+        enhance()
+    assert not isinstance(error.value, ProviderUnavailable)
+    assert provider.requests == 1
+    assert llm_helper.openai_gateway.breaker.state == "closed"
+
+
+def test_circuit_breaker_fails_fast_then_recovers(provider):
+    llm_helper.openai_gateway.breaker.failure_threshold = 3
+    provider.script = [500] * 3
+    with pytest.raises(ProviderUnavailable):
+        enhance()
+    assert provider.requests == 3
+    assert llm_helper.openai_gateway.breaker.state == "open"
+
+    with pytest.raises(ProviderUnavailable, match="circuit open"):
+        enhance()
+    assert provider.requests == 3
+
+    time.sleep(0.25)
+    assert enhance() == "Enhanced resume"
+    assert llm_helper.openai_gateway.breaker.state == "closed"
+
+
+def test_cancelled_trial_call_releases_the_circuit(provider):
+    gateway = llm_helper.openai_gateway
+    gateway.breaker.failure_threshold = 1
+    provider.script = [500]
+    with pytest.raises(ProviderUnavailable, match="circuit open"):
+        enhance()
+    time.sleep(0.25)
+
+    async def cancelled_trial():
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(gateway.call(lambda: asyncio.sleep(10)), 0.05)
+    asyncio.run(cancelled_trial())
+    assert gateway.breaker.state == "half-open"
+
+    assert enhance() == "Enhanced resume"
+    assert gateway.breaker.state == "closed"
+
+
+def test_no_api_key_returns_original_text(provider, monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY")
+    monkeypatch.delenv("EMERGENT_LLM_KEY", raising=False)
+    assert enhance("Original resume") == "Original resume"
+    assert provider.requests == 0
+
+
+def test_token_bucket_limits_rate():
+    async def run():
+        bucket = TokenBucket(rate_per_minute=600, burst=2)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    # Two tokens up front, then one every 0.1s
+    assert 0.18 <= asyncio.run(run()) < 0.5
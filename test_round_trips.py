@@ -0,0 +1,247 @@
+"""
+MongoDB round trips per resume endpoint, counted with an in-memory fake database
+"""
+import copy
+import os
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "round_trip_test")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "backend"))
+
+import server  # noqa: E402
+from render_cache import RenderCache  # noqa: E402
+from resume_store import ResumeStore  # noqa: E402
+
+# Collections holding resume data; caches and locks have their own budgets
+DATA_COLLECTIONS = {"resumes", "enhanced_resumes", "ats_scores"}
+USER_ID = "user-1"
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else self.docs
+
+
+class FakeCollection:
+    """The subset of a Motor collection the app uses; every call is one round trip."""
+
+    def __init__(self, db, name):
+        self.db = db
+        self.name = name
+        self.docs = []
+
+    def _record(self, op):
+        self.db.round_trips.append((self.name, op))
+
+    def _find(self, filter):
+        return [d for d in self.docs if all(d.get(k) == v for k, v in filter.items())]
+
+    async def insert_one(self, doc):
+        self._record("insert_one")
+        self.docs.append(copy.deepcopy(doc))
+
+    async def find_one(self, filter, projection=None):
+        self._record("find_one")
+        found = self._find(filter)
+        return project(copy.deepcopy(found[0]), projection) if found else None
+
+    async def update_one(self, filter, update, upsert=False):
+        self._record("update_one")
+        for doc in self._find(filter)[:1]:
+            doc.update(copy.deepcopy(update.get("$set", {})))
+
+    async def find_one_and_update(self, filter, update, **kwargs):
+        self._record("find_one_and_update")
+        return None
+
+    async def replace_one(self, filter, replacement, upsert=False):
+        self._record("replace_one")
+
+    async def delete_one(self, filter):
+        self._record("delete_one")
+
+    def aggregate(self, pipeline):
+        self._record("aggregate")
+        return FakeCursor(self._run(pipeline))
+
+    def _run(self, pipeline):
+        docs = copy.deepcopy(self.docs)
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if all(d.get(k) == v for k, v in arg.items())]
+            elif op == "$limit":
+                docs = docs[:arg]
+            elif op == "$set":
+                docs = [{**d, **arg} for d in docs]
+            elif op == "$unionWith":
+                docs += self.db[arg["coll"]]._run(arg["pipeline"])
+            elif op == "$lookup":
+                foreign = self.db[arg["from"]]
+                docs = [{**d, arg["as"]: copy.deepcopy(foreign._find({arg["foreignField"]: d.get(arg["localField"])}))}
+                        for d in docs]
+            elif op == "$project":
+                docs = [project(d, arg) for d in docs]
+            else:
+                raise NotImplementedError(op)
+        return docs
+
+
+def project(doc, projection):
+    if not projection:
+        return doc
+    if any(v for k, v in projection.items() if k != "_id"):
+        return {k: v for k, v in doc.items() if projection.get(k)}
+    for field in projection:
+        name, _, nested = field.partition(".")
+        if nested:
+            for item in doc.get(name) or []:
+                item.pop(nested, None)
+        else:
+            doc.pop(name, None)
+    return doc
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.round_trips = []
+        self.collections = {}
+
+    def __getitem__(self, name):
+        if name not in self.collections:
+            self.collections[name] = FakeCollection(self, name)
+        return self.collections[name]
+
+    __getattr__ = __getitem__
+
+    def data_round_trips(self):
+        """Round trips to the resume collections since the last call."""
+        trips = [t for t in self.round_trips if t[0] in DATA_COLLECTIONS]
+        self.round_trips.clear()
+        return trips
+
+
+@pytest.fixture
+def api(monkeypatch, tmp_path):
+    db = FakeDatabase()
+    monkeypatch.setattr(server, "db", db)
+    monkeypatch.setattr(server, "resume_store", ResumeStore(db))
+    monkeypatch.setattr(server, "render_cache", RenderCache(str(tmp_path), 16 * 1024 * 1024))
+    for name in ("upload_cache", "llm_cache", "enhancement_locks"):
+        monkeypatch.setattr(getattr(server, name), "collection", db[name])
+    for key in ("OPENAI_API_KEY", "GEMINI_API_KEY", "EMERGENT_LLM_KEY"):
+        monkeypatch.delenv(key, raising=False)
+
+    token = server.create_access_token({"sub": USER_ID, "email": "user@example.com"})
+    client = TestClient(server.app, headers={"Authorization": f"Bearer {token}"})
+    yield client, db
+    server.render_pool.shutdown()
+
+
+def create_resume(client):
+    response = client.post("/api/resume/manual", json={
+        "full_name": "Jane Doe",
+        "email": "jane@example.com",
+        "phone": "555-0100",
+        "summary": "Backend engineer",
+        "experience": "Engineer | Acme | 2020 - Present\n- Built APIs with Python",
+        "education": "B.Sc. Computer Science",
+        "skills": "Python, MongoDB",
+    })
+    assert response.status_code == 200
+    return response.json()["resume_id"]
+
+
+def test_create_resume_is_one_insert(api):
+    client, db = api
+    create_resume(client)
+    assert db.data_round_trips() == [("resumes", "insert_one")]
+    assert "ats_score" in db.resumes.docs[0]
+    assert db.ats_scores.docs == []
+
+
+def test_upload_is_one_insert(api, monkeypatch):
+    client, db = api
+    text = "JANE DOE\nEXPERIENCE\nEngineer at Acme\nSKILLS\nPython"
+
+    async def analyze_upload(file):
+        sections = server.parse_resume_sections(text)
+        return text, sections, server.calculate_ats_score(text, sections)
+
+    monkeypatch.setattr(server, "analyze_upload", analyze_upload)
+    response = client.post("/api/resume/upload", files={"file": ("resume.pdf", b"%PDF", "application/pdf")})
+    assert response.status_code == 200
+    assert db.data_round_trips() == [("resumes", "insert_one")]
+
+
+def test_get_resume_is_one_query(api):
+    client, db = api
+    resume_id = create_resume(client)
+    db.data_round_trips()
+
+    body = client.get(f"/api/resume/{resume_id}").json()
+    assert db.data_round_trips() == [("resumes", "aggregate")]
+    assert body["ats_score"]["resume_id"] == resume_id
+    assert "ats_score" not in body["resume"]
+
+
+def test_get_resume_reads_legacy_score_in_the_same_query(api):
+    client, db = api
+    db.resumes.docs.append({"id": "legacy", "user_id": USER_ID, "raw_text": "Old resume", "sections": []})
+    db.ats_scores.docs.append({"_id": 1, "resume_id": "legacy", "overall_score": 42})
+
+    body = client.get("/api/resume/legacy").json()
+    assert db.data_round_trips() == [("resumes", "aggregate")]
+    assert body["ats_score"] == {"resume_id": "legacy", "overall_score": 42}
+
+
+def test_missing_resume_is_404(api):
+    client, db = api
+    assert client.get("/api/resume/nope").status_code == 404
+    assert db.data_round_trips() == [("resumes", "aggregate")]
+
+
+def test_enhance_is_one_read_and_one_insert(api):
+    client, db = api
+    resume_id = create_resume(client)
+    db.data_round_trips()
+
+    response = client.post("/api/resume/enhance", json={"resume_id": resume_id, "enhancement_type": "openai"})
+    assert response.status_code == 200
+    assert db.data_round_trips() == [("resumes", "find_one"), ("enhanced_resumes", "insert_one")]
+    assert db.enhanced_resumes.docs[0]["ats_score"]["resume_id"] == response.json()["enhanced_resume_id"]
+
+
+def test_generate_enhanced_resume_is_one_query(api):
+    client, db = api
+    resume_id = create_resume(client)
+    enhanced_id = client.post("/api/resume/enhance", json={"resume_id": resume_id, "enhancement_type": "openai"}
+                              ).json()["enhanced_resume_id"]
+    db.data_round_trips()
+
+    # The first download also stores the parsed layout on the document
+    assert client.get(f"/api/resume/generate/{enhanced_id}", params={"format": "latex"}).status_code == 200
+    assert db.data_round_trips() == [("resumes", "aggregate"), ("enhanced_resumes", "update_one")]
+
+    assert client.get(f"/api/resume/generate/{enhanced_id}", params={"format": "latex"}).status_code == 200
+    assert db.data_round_trips() == [("resumes", "aggregate")]
+
+
+def test_match_is_one_query_once_vectorized(api):
+    client, db = api
+    resume_id = create_resume(client)
+    db.data_round_trips()
+
+    request = {"job_description": "Python engineer building APIs"}
+    assert client.post(f"/api/resume/{resume_id}/match", json=request).status_code == 200
+    assert db.data_round_trips() == [("resumes", "aggregate"), ("resumes", "update_one")]
+
+    assert client.post(f"/api/resume/{resume_id}/match", json=request).status_code == 200
+    assert db.data_round_trips() == [("resumes", "aggregate")]